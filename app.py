@@ -4,8 +4,21 @@ from datetime import datetime, timedelta
 import plotly.graph_objects as go
 import plotly.express as px
 from supabase_client import *
-from transformers import pipeline
+from resilience import QueryResult
+from job_queue import start_worker, get_queue_status, retry_failed_jobs
+from search_index import get_index, rebuild_index, search_meetings
+from vector_index import get_vector_index, index_building, rebuild_vector_index, semantic_search
+from export import EXPORT_FORMATS, export_meetings_to_file
+from retention import load_checkpoint, run_retention
+from archive import archive_old_records, get_archive_stats, restore_meeting
+from codec_migration import run_codec_migration
+from text_codec import TEXT_CODEC_ENABLED
+from meeting_frame import (
+    MEETING_WINDOW_SIZE, build_meeting_frame, fetch_meeting_cards_frame, fetch_meeting_cards_frame_by_ids,
+    fetch_recent_meetings_frame, frame_window,
+)
 import json
+import os
 import re
 import io
 from datetime import date
@@ -202,106 +215,59 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize session state
-if 'selected_meeting' not in st.session_state:
-    st.session_state.selected_meeting = None
+if 'selected_meeting_id' not in st.session_state:
+    st.session_state.selected_meeting_id = None
+if 'meeting_details' not in st.session_state:
+    st.session_state.meeting_details = {}
 if 'show_popup' not in st.session_state:
     st.session_state.show_popup = False
 if 'edit_mode' not in st.session_state:
     st.session_state.edit_mode = False
 if 'show_manual_entry' not in st.session_state:
     st.session_state.show_manual_entry = False
-if 'summarizer' not in st.session_state:
-    try:
-        # Only show model loading message once
-        with st.spinner("Loading AI model..."):
-            st.session_state.summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-    except Exception as e:
-        st.error(f"Error loading summarization model: {e}")
-        st.session_state.summarizer = None
-
-# Helper functions (same as before)
-def extract_key_points(text, num_points=5):
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
-    key_sentences = sorted(sentences, key=len, reverse=True)[:num_points]
-    return key_sentences
-
-def extract_followup_points(text):
-    followup_keywords = ['follow up', 'next steps', 'action items', 'todo', 'will discuss', 'next meeting', 'review']
-    followup_points = []
-    sentences = re.split(r'[.!?]+', text.lower())
-    for sentence in sentences:
-        if any(keyword in sentence for keyword in followup_keywords):
-            followup_points.append(sentence.strip().capitalize())
-    return followup_points[:3] if followup_points else ["Review meeting outcomes", "Schedule follow-up discussion"]
-
-def extract_next_meeting_schedule(text):
-    date_patterns = [
-        r'next (monday|tuesday|wednesday|thursday|friday|saturday|sunday)',
-        r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday) next week',
-        r'in (\\d+) days?',
-        r'next month',
-        r'next week'
-    ]
-    text_lower = text.lower()
-    for pattern in date_patterns:
-        if re.search(pattern, text_lower):
-            return (datetime.now() + timedelta(days=7)).isoformat()
-    return None
-
-def process_transcript_for_meeting(transcript_data):
-    if not transcript_data or not transcript_data.get('transcript_text'):
-        return None
-    
-    transcript_text = transcript_data['transcript_text']
-    summary = ""
-    
-    if st.session_state.summarizer and len(transcript_text) > 100:
-        try:
-            summary_result = st.session_state.summarizer(transcript_text, max_length=150, min_length=50, do_sample=False)
-            summary = summary_result[0]['summary_text']
-        except Exception as e:
-            summary = transcript_text[:200] + "..." if len(transcript_text) > 200 else transcript_text
-    else:
-        summary = transcript_text[:200] + "..." if len(transcript_text) > 200 else transcript_text
-    
-    key_points = extract_key_points(transcript_text)
-    followup_points = extract_followup_points(transcript_text)
-    next_schedule = extract_next_meeting_schedule(transcript_text)
-    
-    return {
-        'title': transcript_data.get('meeting_title', 'Untitled Meeting'),
-        'summary': summary,
-        'key_points': key_points,
-        'followup_points': followup_points,
-        'next_meet_schedule': next_schedule,
-        'transcript_id': transcript_data['id']
-    }
+if 'meeting_cursors' not in st.session_state:
+    st.session_state.meeting_cursors = [None]
+if 'meeting_window_start' not in st.session_state:
+    st.session_state.meeting_window_start = 0
+if 'space_tab_loaded' not in st.session_state:
+    st.session_state.space_tab_loaded = False
 
-def create_meeting_card(meeting, index):
-    source = "🤖 Automatic" if meeting.get('transcript_id') else "✍️ Manual"
-    created_date = pd.to_datetime(meeting['created_at']).strftime('%Y-%m-%d %H:%M')
-    updated_date = pd.to_datetime(meeting['updated_at']).strftime('%Y-%m-%d %H:%M')
-    
-    key_points_preview = ""
-    if meeting.get('key_points'):
-        preview_points = meeting['key_points'][:2]
-        key_points_preview = " • ".join([point[:50] + "..." if len(point) > 50 else point for point in preview_points])
-        if len(meeting['key_points']) > 2:
-            key_points_preview += f" • +{len(meeting['key_points']) - 2} more"
+# Start the shared background worker for transcript summarization
+start_worker()
+
+def create_meeting_card(card):
+    """Render one row of the meeting cards frame; every field is precomputed"""
+    source = f"🤖 {card.source}" if card.is_automatic else f"✍️ {card.source}"
     
     card_html = f"""
-    <div class="meeting-card" id="meeting-{index}">
-        <div class="card-title">📋 {meeting.get('title', 'Untitled Meeting')}</div>
-        <div class="card-subtitle">{source} • 📅 Created: {created_date}</div>
-        <div class="card-subtitle">🔄 Updated: {updated_date}</div>
-        {f'<div class="card-content">🔑 Key Points: {key_points_preview}</div>' if key_points_preview else ''}
+    <div class="meeting-card" id="meeting-{card.id}">
+        <div class="card-title">📋 {card.title}</div>
+        <div class="card-subtitle">{source} • 📅 Created: {card.created_label}</div>
+        <div class="card-subtitle">🔄 Updated: {card.updated_label}</div>
+        {f'<div class="card-content">🔑 Key Points: {card.key_points_preview}</div>' if card.key_points_preview else ''}
     </div>
     """
     return card_html
 
-def show_meeting_popup(meeting):
-    """Show meeting details in a floating modal-like overlay."""
+def get_meeting_details(meeting_id):
+    """Fetch the full meeting record once and keep it for this session (a QueryResult).
+
+    Only successful loads are kept, so a failed fetch is retried on the next run.
+    """
+    details = st.session_state.meeting_details
+    if meeting_id in details:
+        return QueryResult(details[meeting_id])
+    result = fetch_meeting_by_id(meeting_id)
+    if result.ok:
+        details[meeting_id] = result.data
+    return result
+
+def show_meeting_popup(meeting, card):
+    """Show meeting details in a floating modal-like overlay.
+
+    `card` is the meeting's row in the cards frame and supplies the
+    already formatted dates and source.
+    """
     
     if "show_popup" not in st.session_state:
         st.session_state.show_popup = False
@@ -361,7 +327,7 @@ def show_meeting_popup(meeting):
         if st.button("❌ Close", key="popup_close"):
             st.session_state.show_popup = False
             st.session_state.edit_mode = False
-            st.experimental_rerun()
+            st.rerun(scope="fragment")
 
         if st.button("✏️ Edit", key="popup_edit"):
             st.session_state.edit_mode = True
@@ -370,6 +336,7 @@ def show_meeting_popup(meeting):
         # Always define points
         key_points = meeting.get('key_points', [])
         followup_points = meeting.get('followup_points', [])
+        next_meet = pd.to_datetime(meeting['next_meet_schedule']) if meeting.get('next_meet_schedule') else None
 
         if st.session_state.edit_mode:
             title = st.text_input("Meeting Title", value=meeting.get('title', ''), key="popup_title")
@@ -393,7 +360,7 @@ def show_meeting_popup(meeting):
 
             next_schedule = st.date_input(
                 "Next Meeting Schedule",
-                value=pd.to_datetime(meeting.get('next_meet_schedule')).date() if meeting.get('next_meet_schedule') else None,
+                value=next_meet.date() if next_meet is not None else None,
                 key="popup_next_meeting"
             )
 
@@ -405,16 +372,17 @@ def show_meeting_popup(meeting):
                 if success:
                     st.success("Meeting updated successfully!")
                     st.session_state.edit_mode = False
-                    st.experimental_rerun()
+                    st.session_state.meeting_details.pop(meeting['id'], None)
+                    # The edit changes the list and the stats, so rerun the whole app
+                    st.rerun()
                 else:
                     st.error("Error updating meeting")
         else:
             # View mode
             st.markdown(f"**Title:** {meeting.get('title', 'N/A')}")
-            source = "Automatic" if meeting.get('transcript_id') else "Manual"
-            st.markdown(f"**Source:** {source}")
-            st.markdown(f"**Created:** {pd.to_datetime(meeting['created_at']).strftime('%Y-%m-%d %H:%M')}")
-            st.markdown(f"**Updated:** {pd.to_datetime(meeting['updated_at']).strftime('%Y-%m-%d %H:%M')}")
+            st.markdown(f"**Source:** {card.source}")
+            st.markdown(f"**Created:** {card.created_label}")
+            st.markdown(f"**Updated:** {card.updated_label}")
             st.markdown("**Summary:**")
             st.write(meeting.get('summary', 'No summary available'))
 
@@ -432,8 +400,8 @@ def show_meeting_popup(meeting):
             else:
                 st.write("No follow-up points available")
 
-            if meeting.get('next_meet_schedule'):
-                st.markdown(f"**Next Meeting:** {pd.to_datetime(meeting['next_meet_schedule']).strftime('%Y-%m-%d')}")
+            if next_meet is not None:
+                st.markdown(f"**Next Meeting:** {next_meet.strftime('%Y-%m-%d')}")
 
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -478,6 +446,63 @@ def manual_entry_form():
         
         st.markdown('</div>', unsafe_allow_html=True)
 
+def transcript_queue_status():
+    """Show progress of background transcript summarization"""
+    status = get_queue_status()
+    remaining = status['pending'] + status['running']
+    if not remaining and not status['failed']:
+        return
+
+    processed = status['done'] + status['failed']
+    st.progress(processed / status['total'] if status['total'] else 0.0)
+    st.caption(
+        f"🤖 Summarizing transcripts in the background: {status['done']} done, "
+        f"{status['running']} running, {status['pending']} pending, {status['failed']} failed"
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if remaining and st.button("🔄 Refresh Status", key="refresh_queue_status"):
+            st.rerun(scope="fragment")
+    with col2:
+        if status['failed'] and st.button("🔁 Retry Failed", key="retry_failed_jobs"):
+            retry_failed_jobs()
+            st.rerun(scope="fragment")
+
+def meeting_page_controls(next_cursor):
+    """Previous/next controls for the keyset-paginated meeting list"""
+    cursors = st.session_state.meeting_cursors
+    col1, col2, col3 = st.columns([1, 2, 1])
+
+    with col1:
+        if len(cursors) > 1 and st.button("⬅️ Previous", key="previous_meeting_page"):
+            cursors.pop()
+            st.session_state.meeting_window_start = 0
+            st.rerun(scope="fragment")
+    with col2:
+        st.caption(f"Page {len(cursors)}")
+    with col3:
+        if next_cursor and st.button("Next ➡️", key="next_meeting_page"):
+            cursors.append(next_cursor)
+            st.session_state.meeting_window_start = 0
+            st.rerun(scope="fragment")
+
+def meeting_window_controls(start, total):
+    """Move the rendered window of cards through the loaded page"""
+    col1, col2, col3 = st.columns([1, 2, 1])
+
+    with col1:
+        if start > 0 and st.button("⬆️ Earlier", key="meeting_window_earlier"):
+            st.session_state.meeting_window_start = max(0, start - MEETING_WINDOW_SIZE)
+            st.rerun(scope="fragment")
+    with col2:
+        st.caption(f"Meetings {start + 1}–{min(start + MEETING_WINDOW_SIZE, total)} of {total}")
+    with col3:
+        if start + MEETING_WINDOW_SIZE < total and st.button("⬇️ Later", key="meeting_window_later"):
+            st.session_state.meeting_window_start = start + MEETING_WINDOW_SIZE
+            st.rerun(scope="fragment")
+
+@st.fragment
 def meeting_details_tab():
     st.markdown('<div class="controls-section">', unsafe_allow_html=True)
     
@@ -485,6 +510,9 @@ def meeting_details_tab():
     
     with col1:
         search_query = st.text_input("🔍 Search meetings", placeholder="Search by title or content...")
+        search_mode = st.radio("Search mode", ["Title & summary", "Full-text", "Semantic"], horizontal=True, key="search_mode",
+                               help="Full-text ranks matches across key points, follow-ups and transcripts; "
+                                    "Semantic finds meetings about similar topics")
     
     with col2:
         date_filter = st.selectbox("📅 Filter by Date", ["All", "Today", "This Week", "This Month", "Custom Range"])
@@ -524,70 +552,220 @@ def meeting_details_tab():
         manual_entry_form()
         if st.button("❌ Cancel", key="cancel_manual_entry"):
             st.session_state.show_manual_entry = False
-            st.rerun()
+            st.rerun(scope="fragment")
         return
     
-    meetings = fetch_meetings()
+    # Summaries are produced by the background worker; only report progress here
+    transcript_queue_status()
     
-    if not meetings:
-        st.info("🎯 No meetings found. Use the Manual Entry button to add your first meeting.")
+    # Start from the first page whenever the filters change
+    filters = (search_query, search_mode, start_date, end_date)
+    if st.session_state.get('meeting_filters') != filters:
+        st.session_state.meeting_filters = filters
+        st.session_state.meeting_cursors = [None]
+        st.session_state.meeting_window_start = 0
+    
+    if search_query and search_mode == "Full-text":
+        # Ranked local search; the database only applies the date range
+        hits = search_meetings(search_query)
+        result = fetch_meeting_cards_frame_by_ids([meeting_id for meeting_id, _ in hits], start_date, end_date)\
+            .map(lambda cards: (cards, None))
+    elif search_query and search_mode == "Semantic":
+        # Nearest meetings by embedding similarity, in similarity order
+        try:
+            hits = semantic_search(search_query)
+        except Exception as e:
+            # The embedding model may be missing or fail to load; don't take the tab down
+            print(f"Error running semantic search: {e}")
+            st.error("⚠️ Semantic search is unavailable right now. Try Full-text search instead.")
+            return
+        if index_building():
+            st.caption("⏳ The semantic index is still being built; results don't cover every meeting yet.")
+        result = fetch_meeting_cards_frame_by_ids([meeting_id for meeting_id, _ in hits], start_date, end_date)\
+            .map(lambda cards: (cards, None))
+    else:
+        # Search and date filters run in the database
+        result = fetch_meeting_cards_frame(
+            cursor=st.session_state.meeting_cursors[-1],
+            search=search_query,
+            start_date=start_date,
+            end_date=end_date
+        )
+
+    # A failed query is not an empty list; say so instead of "no meetings"
+    if result.failed:
+        st.error("⚠️ Could not load meetings right now. Please try again in a moment.")
         return
+    cards, next_cursor = result.data
     
-    # Process unprocessed transcripts
-    for meeting in meetings:
-        if meeting.get('transcript_id') and not meeting.get('summary'):
-            transcript = fetch_transcript_by_id(meeting['transcript_id'])
-            if transcript:
-                processed_data = process_transcript_for_meeting(transcript)
-                if processed_data:
-                    update_meeting(
-                        meeting['id'],
-                        processed_data['title'],
-                        processed_data['summary'],
-                        processed_data['key_points'],
-                        processed_data['followup_points'],
-                        processed_data['next_meet_schedule']
-                    )
-    
-    meetings = fetch_meetings()
-    filtered_meetings = meetings
-    
-    if search_query:
-        filtered_meetings = [
-            m for m in filtered_meetings 
-            if search_query.lower() in m.get('title', '').lower() or 
-               search_query.lower() in m.get('summary', '').lower()
-        ]
-    
-    if start_date and end_date:
-        filtered_meetings = [
-            m for m in filtered_meetings
-            if start_date <= pd.to_datetime(m['created_at']).date() <= end_date
-        ]
-    
-    if not filtered_meetings:
-        st.info("🔍 No meetings match your search criteria.")
+    if cards.empty:
+        if search_query or start_date or end_date:
+            st.info("🔍 No meetings match your search criteria.")
+        else:
+            st.info("🎯 No meetings found. Use the Manual Entry button to add your first meeting.")
+        meeting_page_controls(next_cursor)
         return
     
-    st.markdown(f"### 🎯 Found {len(filtered_meetings)} meeting(s)")
+    st.markdown(f"### 🎯 Showing {len(cards)} meeting(s)")
     
-    for index, meeting in enumerate(filtered_meetings):
-        card_html = create_meeting_card(meeting, index)
+    # Only the visible window of cards is built; keys follow the meeting id
+    window, start = frame_window(cards, st.session_state.meeting_window_start)
+    st.session_state.meeting_window_start = start
+    for card in window.itertuples(index=False):
+        card_html = create_meeting_card(card)
         st.markdown(card_html, unsafe_allow_html=True)
         
-        if st.button(f"👁️ View Details", key=f"view_meeting_{index}"):
-            st.session_state.selected_meeting = meeting
+        if st.button(f"👁️ View Details", key=f"view_meeting_{card.id}"):
+            st.session_state.selected_meeting_id = card.id
             st.session_state.show_popup = True
             st.session_state.edit_mode = False
     
-    if st.session_state.show_popup and st.session_state.selected_meeting:
-        show_meeting_popup(st.session_state.selected_meeting)
-
-def space_management_tab():
-    st.markdown("## 💾 Space Management")
-    
-    stats = get_database_stats()
+    meeting_window_controls(start, len(cards))
+    meeting_page_controls(next_cursor)
     
+    meeting_popup(cards)
+
+@st.fragment
+def meeting_popup(cards):
+    """Selected meeting's popup; its buttons rerun only this fragment"""
+    if st.session_state.show_popup and st.session_state.selected_meeting_id:
+        result = get_meeting_details(st.session_state.selected_meeting_id)
+        if result.failed:
+            st.error(f"⚠️ Error loading meeting details: {result.error}")
+            if st.button("🔄 Retry", key="retry_meeting_details"):
+                st.rerun(scope="fragment")
+        elif result.data is None:
+            st.warning("This meeting no longer exists.")
+        else:
+            meeting = result.data
+            meeting_key = str(meeting['id'])
+            # The selected meeting is normally on this page; otherwise frame it on its own
+            card = cards.loc[meeting_key] if meeting_key in cards.index else build_meeting_frame([meeting]).iloc[0]
+            show_meeting_popup(meeting, card)
+
+def run_retention_job(cutoff_date, dry_run):
+    """Delete (or preview) records older than cutoff_date batch by batch with live progress"""
+    status = st.empty()
+    verb = "matched" if dry_run else "deleted"
+
+    def show_progress(report):
+        status.caption(f"⏳ {report.total} rows {verb} in {report.batches} batches ({report.rows_per_second:.0f} rows/s)")
+
+    try:
+        report = run_retention(cutoff_date.isoformat(), dry_run=dry_run, on_batch=show_progress)
+    except Exception as e:
+        status.empty()
+        if dry_run:
+            st.error(f"Preview failed: {e}")
+        else:
+            st.error(f"Deletion stopped: {e}. Run it again to resume after the last completed batch.")
+        return
+    status.empty()
+
+    if dry_run:
+        st.session_state.retention_report = report
+    elif report.total:
+        # Counts and lists above are stale now; show the report after a full rerun
+        st.session_state.retention_report = report
+        st.rerun()
+    else:
+        st.info("No records found matching the criteria.")
+
+
+def show_retention_report(report):
+    counts = f"{report.deleted['meetings']} meetings and {report.deleted['transcripts']} transcripts"
+    if report.dry_run:
+        st.info(f"Would delete {counts}.")
+    else:
+        st.success(f"Deleted {counts} in {report.elapsed:.1f}s ({report.rows_per_second:.0f} rows/s).")
+    if report.kept_referenced:
+        st.caption(f"{report.kept_referenced} old transcripts are kept because newer meetings still use them.")
+
+
+def run_archive_job(cutoff_date):
+    """Move records older than cutoff_date into the local archive with live progress"""
+    status = st.empty()
+
+    def show_progress(report):
+        status.caption(f"⏳ {report.total} rows archived in {report.batches} batches ({report.rows_per_second:.0f} rows/s)")
+
+    try:
+        report = archive_old_records(cutoff_date.isoformat(), on_batch=show_progress)
+    except Exception as e:
+        status.empty()
+        st.error(f"Archiving stopped: {e}. Records already archived stay restorable; run it again to continue.")
+        return
+    status.empty()
+
+    if report.total:
+        st.session_state.archive_message = (
+            f"Archived {report.meetings} meetings and {report.transcripts} transcripts "
+            f"({report.bytes_written / 1024:.0f} KB compressed) in {report.elapsed:.1f}s."
+        )
+        st.rerun()
+    else:
+        st.info("No records found matching the criteria.")
+
+
+def restore_archived_meeting(meeting_id):
+    try:
+        meeting = restore_meeting(meeting_id)
+    except Exception as e:
+        st.error(f"Restore failed: {e}")
+        return
+    if meeting is None:
+        st.warning("No archived meeting with that ID.")
+        return
+    st.session_state.archive_message = f"Restored meeting: {meeting.get('title') or 'Untitled Meeting'}"
+    st.rerun()
+
+
+def stream_export(start_date, end_date, fmt, compress):
+    """Stream an export to a temp file with live rows/s, then offer it for download"""
+    status = st.empty()
+
+    def show_progress(progress):
+        status.caption(f"⏳ {progress.rows} rows exported ({progress.rows_per_second:.0f} rows/s)")
+
+    try:
+        path, progress = export_meetings_to_file(start_date.isoformat(), end_date.isoformat(), fmt, compress,
+                                                 on_page=show_progress)
+    except Exception as e:
+        status.empty()
+        st.error(f"Export failed: {e}")
+        return
+
+    # The download button keeps its own copy of the bytes, so the file can go right away
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    finally:
+        os.remove(path)
+
+    if not progress.rows:
+        status.empty()
+        st.info("No data found for the selected date range.")
+        return
+
+    status.caption(
+        f"✅ {progress.rows} rows in {progress.elapsed:.1f}s "
+        f"({progress.rows_per_second:.0f} rows/s, {progress.bytes / 1024:.0f} KB)"
+    )
+    extension, mime = EXPORT_FORMATS[fmt]
+    if fmt == "csv" and compress:
+        extension, mime = "csv.gz", "application/gzip"
+    st.download_button(
+        label="💾 Download Export",
+        data=data,
+        file_name=f"meetings_export_{start_date}_to_{end_date}.{extension}",
+        mime=mime,
+        key="download_export"
+    )
+    st.success("Data exported successfully! Click the download button above.")
+
+
+def storage_overview(stats):
+    """Counts, quota usage and per-table and per-column storage"""
     st.markdown("### 📊 Storage Overview")
     
     col1, col2, col3, col4 = st.columns(4)
@@ -608,27 +786,38 @@ def space_management_tab():
         </div>
         """, unsafe_allow_html=True)
     
+    # Counts still show when only the storage measurement failed
+    measured = stats['storage_error'] is None
+    
     with col3:
+        used = f"{stats['total_size_mb']:.1f} MB" if measured else "n/a"
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-title">💾 Storage Used</div>
-            <div class="metric-value">{stats['total_size_mb']:.1f} MB</div>
+            <div class="metric-value">{used}</div>
         </div>
         """, unsafe_allow_html=True)
     
     with col4:
-        remaining_storage = max(1024 - stats['total_size_mb'], 0)
+        available = f"{max(STORAGE_QUOTA_MB - stats['total_size_mb'], 0):.1f} MB" if measured else "n/a"
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-title">🔓 Available Space</div>
-            <div class="metric-value">{remaining_storage:.1f} MB</div>
+            <div class="metric-value">{available}</div>
         </div>
         """, unsafe_allow_html=True)
     
+    if not measured:
+        st.warning(f"⚠️ Storage breakdown unavailable: {stats['storage_error']}")
+        if st.button("🔄 Refresh Storage Stats", key="refresh_storage_stats"):
+            refresh_storage_stats()
+            st.rerun(scope="fragment")
+        return
+    
     st.markdown("### 📈 Storage Usage")
-    progress_value = min(stats['total_size_mb'] / 1024, 1.0)
+    progress_value = min(stats['total_size_mb'] / STORAGE_QUOTA_MB, 1.0)
     st.progress(progress_value)
-    st.markdown(f"**💾 {stats['total_size_mb']:.1f} MB of 1024 MB used ({progress_value*100:.1f}%)**")
+    st.markdown(f"**💾 {stats['total_size_mb']:.1f} MB of {STORAGE_QUOTA_MB:.0f} MB used ({progress_value*100:.1f}%)**")
     
     if progress_value > 0.8:
         st.warning("⚠️ Storage is getting full! Consider deleting old records to free up space.")
@@ -650,6 +839,46 @@ def space_management_tab():
         plot_bgcolor='rgba(0,0,0,0)'
     )
     st.plotly_chart(fig, use_container_width=True)
+
+    # Per-column sizes show what is worth compressing or archiving
+    columns = stats.get('columns') or {}
+    if columns:
+        column_df = pd.DataFrame({
+            'Column': list(columns),
+            'Size (MB)': [size / (1024 * 1024) for size in columns.values()],
+        }).sort_values('Size (MB)')
+        column_fig = px.bar(column_df, x='Size (MB)', y='Column', orientation='h',
+                            title="Storage by Column", template="plotly_dark")
+        st.plotly_chart(column_fig, use_container_width=True)
+    if stats.get('measured_at'):
+        st.caption(
+            f"📏 Measured via {stats['storage_source']} at {stats['measured_at'][:19]} UTC; "
+            f"refreshes every {STORAGE_STATS_REFRESH / 60:.0f} min"
+        )
+    if st.button("🔄 Refresh Storage Stats", key="refresh_storage_stats"):
+        refresh_storage_stats()
+        st.rerun(scope="fragment")
+
+
+@st.fragment
+def space_management_tab():
+    st.markdown("## 💾 Space Management")
+    
+    # Nothing here is queried until the tab is first opened
+    if not st.session_state.space_tab_loaded:
+        if not st.button("📊 Load Space Statistics", key="load_space_tab"):
+            return
+        st.session_state.space_tab_loaded = True
+    
+    # Independent dashboard queries go out together
+    stats_result, recent_result = gather(get_database_stats, lambda: fetch_recent_meetings_frame(limit=10))
+    
+    if stats_result.failed:
+        st.error(f"⚠️ Could not load storage statistics: {stats_result.error}")
+        if st.button("🔄 Retry", key="retry_space_stats"):
+            st.rerun(scope="fragment")
+    else:
+        storage_overview(stats_result.data)
     
     st.markdown("### 🗂️ Data Management")
     
@@ -664,14 +893,36 @@ def space_management_tab():
             value=datetime.now().date() - timedelta(days=30)
         )
         
-        if st.button("🗑️ Delete Old Records", key="delete_old_records"):
-            if st.checkbox("I understand this action cannot be undone", key="confirm_delete"):
-                deleted_count = delete_old_records(cutoff_date.isoformat())
-                if deleted_count > 0:
-                    st.success(f"Deleted {deleted_count} old records successfully!")
-                    st.rerun()
-                else:
-                    st.info("No records found matching the criteria.")
+        if load_checkpoint(cutoff_date.isoformat()):
+            st.caption("⏸️ An interrupted deletion for this date will resume where it stopped.")
+        confirm_delete = st.checkbox("I understand this action cannot be undone", key="confirm_delete")
+        
+        preview_col, delete_col = st.columns(2)
+        with preview_col:
+            preview_clicked = st.button("🔍 Preview", key="preview_old_records")
+        with delete_col:
+            delete_clicked = st.button("🗑️ Delete Old Records", key="delete_old_records", disabled=not confirm_delete)
+        
+        if preview_clicked or delete_clicked:
+            run_retention_job(cutoff_date, dry_run=preview_clicked)
+        if 'retention_report' in st.session_state:
+            show_retention_report(st.session_state.pop('retention_report'))
+        
+        # Archiving keeps the rows restorable from local compressed segments
+        if st.button("🧊 Archive Instead", key="archive_old_records"):
+            run_archive_job(cutoff_date)
+        if 'archive_message' in st.session_state:
+            st.success(st.session_state.pop('archive_message'))
+        
+        with st.expander("♻️ Restore Archived Meeting"):
+            archive_stats = get_archive_stats()
+            st.caption(
+                f"{archive_stats['meetings']} meetings and {archive_stats['transcripts']} transcripts archived "
+                f"in {archive_stats['segments']} segments ({archive_stats['size_bytes'] / (1024 * 1024):.1f} MB)"
+            )
+            restore_id = st.text_input("Meeting ID:", key="restore_meeting_id")
+            if st.button("♻️ Restore", key="restore_meeting", disabled=not restore_id.strip()):
+                restore_archived_meeting(restore_id.strip())
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
@@ -680,46 +931,96 @@ def space_management_tab():
         
         export_start_date = st.date_input("Export from:", value=datetime.now().date() - timedelta(days=30))
         export_end_date = st.date_input("Export to:", value=datetime.now().date())
+        export_format = st.selectbox(
+            "Format:", options=["xlsx", "parquet", "csv"],
+            format_func={"xlsx": "📊 Excel (.xlsx)", "parquet": "🧱 Parquet", "csv": "📄 CSV"}.get,
+            key="export_format"
+        )
+        compress_export = st.checkbox("🗜️ Compress (gzip)", key="compress_export", disabled=export_format != "csv")
         
-        if st.button("📥 Export to Excel", key="export_data"):
-            csv_data = export_meetings_csv(
-                export_start_date.isoformat(),
-                export_end_date.isoformat()
-            )
-            
-            if csv_data:
-                st.download_button(
-                    label="💾 Download Excel File",
-                    data=csv_data,
-                    file_name=f"meetings_export_{export_start_date}_to_{export_end_date}.csv",
-                    mime="text/csv",
-                    key="download_csv"
-                )
-                st.success("Data exported successfully! Click the download button above.")
-            else:
-                st.info("No data found for the selected date range.")
+        if st.button("📥 Export Data", key="export_data"):
+            stream_export(export_start_date, export_end_date, export_format, compress_export)
         st.markdown('</div>', unsafe_allow_html=True)
     
     st.markdown("### 📈 Recent Activity")
     
-    meetings = fetch_meetings()
-    if meetings:
-        recent_meetings = meetings[:10]
-        
-        activity_data = []
-        for meeting in recent_meetings:
-            activity_data.append({
-                'Date': pd.to_datetime(meeting['created_at']).date(),
-                'Title': meeting.get('title', 'Untitled'),
-                'Source': '🤖 Automatic' if meeting.get('transcript_id') else '✍️ Manual',
-                'Size (est.)': f"{len(str(meeting.get('summary', ''))) + len(str(meeting.get('key_points', [])))} chars"
-            })
-        
-        df = pd.DataFrame(activity_data)
-        st.dataframe(df, use_container_width=True)
+    recent = recent_result.data
+    if recent_result.failed:
+        st.warning("⚠️ Could not load recent activity.")
+    elif not recent.empty:
+        df = pd.DataFrame({
+            'Date': recent['created_at'].dt.date,
+            'Title': recent['title'],
+            'Source': recent['is_automatic'].map({True: '🤖 Automatic', False: '✍️ Manual'}),
+            'Size (est.)': recent['size_chars'].astype(str) + " chars",
+        })
+        st.dataframe(df, hide_index=True, use_container_width=True)
     else:
         st.info("No recent activity to display.")
 
+    cache_stats = get_query_cache_stats()
+    st.caption(
+        f"⚡ Query cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+        f"{cache_stats['evictions']} evictions, {cache_stats['entries']} entries "
+        f"({cache_stats['hit_rate'] * 100:.0f}% hit rate)"
+    )
+    connection = get_connection_status()
+    st.caption(f"🔌 Database circuit: {connection['state']} ({connection['consecutive_failures']} recent failures)")
+
+    index_stats = get_index().stats()
+    st.caption(f"🔎 Full-text index: {index_stats['documents']} documents, {index_stats['terms']} terms")
+    if st.button("🔄 Rebuild Search Index", key="rebuild_search_index"):
+        with st.spinner("Rebuilding search index..."):
+            try:
+                rebuild_index()
+                st.success("Search index rebuilt!")
+            except Exception as e:
+                st.error(f"Search index rebuild failed, keeping the current index: {e}")
+
+    vector_stats = get_vector_index().stats()
+    st.caption(
+        f"🧠 Semantic index: {vector_stats['vectors']} vectors × {vector_stats['dimensions']} dims "
+        f"({vector_stats['matrix_bytes'] / 1024:.0f} KB{', memory-mapped' if vector_stats['memory_mapped'] else ''})"
+    )
+    if st.button("🔄 Rebuild Semantic Index", key="rebuild_vector_index"):
+        with st.spinner("Embedding all meetings..."):
+            try:
+                rebuild_vector_index()
+                st.success("Semantic index rebuilt!")
+            except Exception as e:
+                st.error(f"Semantic index rebuild failed, keeping the current index: {e}")
+    
+    if not TEXT_CODEC_ENABLED:
+        st.caption(
+            "🗜️ Compression at rest is off. Set TEXT_CODEC_ENABLED=1 to store long text compressed; "
+            "database search then can't match inside compressed values."
+        )
+    dry_run_compression = st.checkbox("Preview only", key="compress_text_dry_run", disabled=not TEXT_CODEC_ENABLED)
+    if st.button("🗜️ Compress Stored Text", key="compress_stored_text", disabled=not TEXT_CODEC_ENABLED):
+        status = st.empty()
+        try:
+            report = run_codec_migration(
+                dry_run=dry_run_compression,
+                on_batch=lambda r: status.caption(f"⏳ {r.rows_scanned} rows scanned ({r.rows_per_second:.0f} rows/s)")
+            )
+        except Exception as e:
+            status.empty()
+            st.error(f"Compression stopped: {e}. Rows already compressed are kept; run it again to continue.")
+        else:
+            status.empty()
+            if report.measured:
+                st.success(
+                    f"Rewrote {report.rows_rewritten} of {report.rows_scanned} rows, "
+                    f"saving {report.bytes_saved / (1024 * 1024):.1f} MB of stored text "
+                    f"({report.bytes_before / (1024 * 1024):.1f} → {report.bytes_after / (1024 * 1024):.1f} MB)."
+                )
+            else:
+                st.success(
+                    f"Would rewrite {report.rows_rewritten} of {report.rows_scanned} rows, "
+                    f"shrinking the text by about {report.bytes_saved / (1024 * 1024):.1f} MB. "
+                    "Postgres already compresses large values, so the stored saving can be smaller."
+                )
+
 def main():
     # Force the blue gradient title
     st.markdown('<h1 class="main-title">🎯 Meeting Manager</h1>', unsafe_allow_html=True)
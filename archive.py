@@ -0,0 +1,255 @@
+# archive.py
+"""Cold-storage tier for old meetings and transcripts.
+
+Rows older than a cutoff are appended to local segment files as JSON
+lines, each line compressed as its own gzip member, and only then
+deleted from the database in batches. A SQLite index maps every archived
+meeting (and stray transcript) to its segment, byte offset and length,
+so restoring one record is a single seek and a small decompress rather
+than a scan of the archive. Segments are append-only and rotate at a
+size limit; a record archived twice simply points the index at the
+newer copy.
+"""
+import gzip
+import json
+import os
+import threading
+from datetime import datetime
+
+from local_store import connect_sqlite
+from progress import RunProgress
+from supabase_client import (
+    delete_meetings_by_ids,
+    delete_transcripts_by_ids,
+    fetch_expired_ids,
+    fetch_referenced_transcript_ids,
+    fetch_rows_by_ids,
+    restore_meeting_rows,
+)
+
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", "archive")
+ARCHIVE_SEGMENT_BYTES = int(os.environ.get("ARCHIVE_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+ARCHIVE_BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", "200"))
+
+_INDEX_FILE = "index.db"
+_SEGMENT_PATTERN = "segment-{:06d}.jsonl.gz"
+
+_write_lock = threading.Lock()
+
+
+_SCHEMA = ("""
+    CREATE TABLE IF NOT EXISTS archive_index (
+        key TEXT PRIMARY KEY,
+        segment TEXT NOT NULL,
+        offset INTEGER NOT NULL,
+        length INTEGER NOT NULL,
+        archived_at TEXT NOT NULL,
+        restored_at TEXT
+    )
+""",)
+
+
+def _connect():
+    """Open the offset index"""
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    return connect_sqlite(os.path.join(ARCHIVE_DIR, _INDEX_FILE), _SCHEMA)
+
+
+def _meeting_key(meeting_id):
+    return f"meeting:{meeting_id}"
+
+
+def _transcript_key(transcript_id):
+    return f"transcript:{transcript_id}"
+
+
+class ArchiveReport(RunProgress):
+    """Counts and throughput of an archive run"""
+
+    def __init__(self, cutoff_date):
+        super().__init__()
+        self.cutoff_date = cutoff_date
+        self.meetings = 0
+        self.transcripts = 0
+        self.bytes_written = 0
+        self.batches = 0
+
+    @property
+    def total(self):
+        return self.meetings + self.transcripts
+
+    @property
+    def rows_done(self):
+        return self.total
+
+
+# --- Segments ---
+
+def _current_segment():
+    """Name of the segment to append to, starting a new one once the last is full"""
+    segments = sorted(name for name in os.listdir(ARCHIVE_DIR) if name.startswith("segment-"))
+    if not segments:
+        return _SEGMENT_PATTERN.format(1)
+    last = segments[-1]
+    if os.path.getsize(os.path.join(ARCHIVE_DIR, last)) < ARCHIVE_SEGMENT_BYTES:
+        return last
+    return _SEGMENT_PATTERN.format(int(last[len("segment-"):len("segment-") + 6]) + 1)
+
+
+def _append_records(records):
+    """Append (key, record) pairs as gzip members, then index them; returns bytes written.
+
+    The segment is fsynced before the index commits, so an indexed record
+    is always on disk before the caller deletes the hot rows.
+    """
+    if not records:
+        return 0
+    with _write_lock:
+        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+        segment = _current_segment()
+        entries = []
+        with open(os.path.join(ARCHIVE_DIR, segment), "ab") as f:
+            offset = f.tell()
+            for key, record in records:
+                line = json.dumps(record, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+                member = gzip.compress(line)
+                f.write(member)
+                entries.append((key, segment, offset, len(member)))
+                offset += len(member)
+            f.flush()
+            os.fsync(f.fileno())
+
+        archived_at = datetime.now().isoformat()
+        with _connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO archive_index (key, segment, offset, length, archived_at, restored_at) "
+                "VALUES (?, ?, ?, ?, ?, NULL)",
+                [entry + (archived_at,) for entry in entries],
+            )
+        return sum(entry[3] for entry in entries)
+
+
+def _read_record(key):
+    with _connect() as conn:
+        row = conn.execute("SELECT segment, offset, length FROM archive_index WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None
+    with open(os.path.join(ARCHIVE_DIR, row["segment"]), "rb") as f:
+        f.seek(row["offset"])
+        member = f.read(row["length"])
+    return json.loads(gzip.decompress(member))
+
+
+# --- Archiving ---
+
+def _archive_meeting_batch(meeting_ids, report):
+    meetings = fetch_rows_by_ids("meetings", meeting_ids)
+    transcript_ids = {meeting["transcript_id"] for meeting in meetings if meeting.get("transcript_id")}
+    transcripts = {str(row["id"]): row for row in fetch_rows_by_ids("transcripts", list(transcript_ids))}
+
+    records = [
+        (_meeting_key(meeting["id"]), {
+            "meeting": meeting,
+            "transcript": transcripts.get(str(meeting.get("transcript_id"))),
+        })
+        for meeting in meetings
+    ]
+    report.bytes_written += _append_records(records)
+    report.meetings += delete_meetings_by_ids([meeting["id"] for meeting in meetings])
+
+    # Transcripts travel with their meeting; drop the hot copy once no meeting uses it
+    still_used = fetch_referenced_transcript_ids(list(transcript_ids))
+    report.transcripts += delete_transcripts_by_ids(
+        [transcript_id for transcript_id in transcript_ids if str(transcript_id) not in still_used]
+    )
+
+
+def _archive_transcript_batch(transcript_ids, report):
+    """Archive old transcripts no meeting refers to any more"""
+    still_used = fetch_referenced_transcript_ids(transcript_ids)
+    orphans = [transcript_id for transcript_id in transcript_ids if str(transcript_id) not in still_used]
+    transcripts = fetch_rows_by_ids("transcripts", orphans)
+    records = [(_transcript_key(row["id"]), {"meeting": None, "transcript": row}) for row in transcripts]
+    report.bytes_written += _append_records(records)
+    report.transcripts += delete_transcripts_by_ids([row["id"] for row in transcripts])
+
+
+def archive_old_records(cutoff_date: str, batch_size: int = ARCHIVE_BATCH_SIZE, on_batch=None):
+    """Move meetings, then orphaned transcripts, created before cutoff_date into the archive.
+
+    Returns an ArchiveReport; `on_batch(report)` is called after every
+    batch. Rows are deleted only after their records are on disk, so a
+    failed run can simply be started again.
+    """
+    report = ArchiveReport(cutoff_date)
+
+    after_id = None
+    while True:
+        meeting_ids = fetch_expired_ids("meetings", cutoff_date, after_id, batch_size)
+        if not meeting_ids:
+            break
+        _archive_meeting_batch(meeting_ids, report)
+        after_id = meeting_ids[-1]
+        report.batches += 1
+        if on_batch is not None:
+            on_batch(report)
+
+    after_id = None
+    while True:
+        transcript_ids = fetch_expired_ids("transcripts", cutoff_date, after_id, batch_size)
+        if not transcript_ids:
+            break
+        _archive_transcript_batch(transcript_ids, report)
+        after_id = transcript_ids[-1]
+        report.batches += 1
+        if on_batch is not None:
+            on_batch(report)
+
+    report.finish()
+    return report
+
+
+# --- Restore ---
+
+def read_archived_meeting(meeting_id):
+    """Return the archived {"meeting", "transcript"} record for a meeting, or None"""
+    return _read_record(_meeting_key(meeting_id))
+
+
+def restore_meeting(meeting_id):
+    """Write an archived meeting (and its transcript) back to the database.
+
+    Returns the restored meeting row, or None if the id is not archived.
+    """
+    record = read_archived_meeting(meeting_id)
+    if record is None:
+        return None
+    restore_meeting_rows(record["meeting"], record.get("transcript"))
+    with _connect() as conn:
+        conn.execute(
+            "UPDATE archive_index SET restored_at = ? WHERE key = ?",
+            (datetime.now().isoformat(), _meeting_key(meeting_id)),
+        )
+    return record["meeting"]
+
+
+def get_archive_stats():
+    """Archived record counts and total segment size on disk"""
+    if not os.path.isdir(ARCHIVE_DIR):
+        return {"meetings": 0, "transcripts": 0, "restored": 0, "segments": 0, "size_bytes": 0}
+    with _connect() as conn:
+        row = conn.execute("""
+            SELECT
+                SUM(key LIKE 'meeting:%') AS meetings,
+                SUM(key LIKE 'transcript:%') AS transcripts,
+                SUM(restored_at IS NOT NULL) AS restored
+            FROM archive_index
+        """).fetchone()
+    segments = [name for name in os.listdir(ARCHIVE_DIR) if name.startswith("segment-")]
+    return {
+        "meetings": row["meetings"] or 0,
+        "transcripts": row["transcripts"] or 0,
+        "restored": row["restored"] or 0,
+        "segments": len(segments),
+        "size_bytes": sum(os.path.getsize(os.path.join(ARCHIVE_DIR, name)) for name in segments),
+    }
@@ -0,0 +1,123 @@
+# codec_migration.py
+"""Recompress existing rows with the current text codec.
+
+Rows are scanned in id-ordered batches. Every codec column value that is
+long enough and not yet in the current codec version is re-encoded and
+written back. A real run measures the codec columns' stored size with
+storage_stats() (pg_column_size, i.e. after Postgres' own TOAST
+compression) before and after; a dry run can only estimate the savings
+from the text's UTF-8 length. Values already in the current version are
+skipped, so an interrupted run can simply be started again.
+"""
+import os
+
+from progress import RunProgress
+from supabase_client import (
+    CODEC_COLUMNS,
+    fetch_codec_column_page,
+    get_storage_stats,
+    refresh_storage_stats,
+    update_stored_values,
+)
+from text_codec import encode_text
+
+CODEC_MIGRATION_BATCH_SIZE = int(os.environ.get("CODEC_MIGRATION_BATCH_SIZE", "200"))
+
+
+class MigrationReport(RunProgress):
+    """Rows scanned and rewritten, and the codec columns' size before and after"""
+
+    def __init__(self, dry_run: bool = False):
+        super().__init__()
+        self.dry_run = dry_run
+        self.rows_scanned = 0
+        self.rows_rewritten = 0
+        # UTF-8 length of the rewritten values, the only figure a dry run has
+        self.logical_bytes_before = 0
+        self.logical_bytes_after = 0
+        # Stored size of the codec columns, measured around a real run
+        self.bytes_before = None
+        self.bytes_after = None
+        self.batches = 0
+
+    @property
+    def measured(self):
+        return self.bytes_before is not None and self.bytes_after is not None
+
+    @property
+    def bytes_saved(self):
+        """Measured stored bytes saved, or the logical estimate for a dry run"""
+        if self.measured:
+            return self.bytes_before - self.bytes_after
+        return self.logical_bytes_before - self.logical_bytes_after
+
+    @property
+    def rows_done(self):
+        return self.rows_scanned
+
+
+def _logical_bytes(value):
+    return len(value.encode("utf-8")) if isinstance(value, str) else 0
+
+
+def _codec_column_bytes():
+    """Current stored size of all codec columns, freshly measured by storage_stats()"""
+    refresh_storage_stats()
+    columns = get_storage_stats().unwrap()["columns"]
+    return sum(
+        columns.get(f"{table}.{column}", 0)
+        for table, codec_columns in CODEC_COLUMNS.items()
+        for column in codec_columns
+    )
+
+
+def _recompress_row(table, row, report):
+    """The column updates for one row, or None if it is already stored as it should be"""
+    update = {}
+    for column, min_chars in CODEC_COLUMNS[table].items():
+        value = row.get(column)
+        encoded = encode_text(value, min_chars)
+        if encoded != value:
+            update[column] = encoded
+            report.logical_bytes_before += _logical_bytes(value)
+            report.logical_bytes_after += _logical_bytes(encoded)
+    if not update:
+        return None
+    update["id"] = row["id"]
+    return update
+
+
+def recompress_table(table: str, report: MigrationReport, batch_size: int = CODEC_MIGRATION_BATCH_SIZE,
+                     on_batch=None):
+    after_id = None
+    while True:
+        rows = fetch_codec_column_page(table, after_id, batch_size)
+        if not rows:
+            return
+        updates = [update for update in (_recompress_row(table, row, report) for row in rows) if update]
+        if updates and not report.dry_run:
+            update_stored_values(table, updates)
+        report.rows_scanned += len(rows)
+        report.rows_rewritten += len(updates)
+        report.batches += 1
+        after_id = rows[-1]["id"]
+        if on_batch is not None:
+            on_batch(report)
+
+
+def run_codec_migration(dry_run: bool = False, batch_size: int = CODEC_MIGRATION_BATCH_SIZE, on_batch=None):
+    """Recompress every codec column in every table; returns a MigrationReport.
+
+    With dry_run=True nothing is written and the report estimates what a
+    real run would save. A real run needs storage_stats() to measure the
+    stored bytes and fails up front without it.
+    """
+    report = MigrationReport(dry_run)
+    if not dry_run:
+        report.bytes_before = _codec_column_bytes()
+    for table in CODEC_COLUMNS:
+        recompress_table(table, report, batch_size, on_batch)
+    if not dry_run:
+        report.bytes_after = _codec_column_bytes()
+    report.finish()
+    return report
@@ -0,0 +1,246 @@
+# export.py
+"""Streaming meeting exports.
+
+Meetings are read page by page with keyset pagination. CSV is produced
+as encoded chunks by a generator, optionally gzip-compressed on the fly.
+Parquet and XLSX are built from typed Arrow record batches, one per page,
+so key points stay lists and timestamps stay timestamps. Only one page
+is held in memory at a time, however long the date range, and throughput
+is reported as rows per second.
+"""
+import csv
+import io
+import os
+import tempfile
+import zlib
+from datetime import datetime
+
+from progress import RunProgress
+from supabase_client import iter_meeting_pages
+
+EXPORT_PAGE_SIZE = int(os.environ.get("EXPORT_PAGE_SIZE", "500"))
+EXPORT_COLUMNS = "id, title, summary, key_points, followup_points, next_meet_schedule, " \
+    "created_at, updated_at, transcripts(meeting_title)"
+
+CSV_HEADERS = ["ID", "Title", "Summary", "Key Points", "Followup Points",
+               "Next Meeting", "Created At", "Updated At", "Original Meeting Title", "Source Type"]
+
+# format -> (file extension, mime type)
+EXPORT_FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "xlsx": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+PARQUET_COMPRESSION = os.environ.get("PARQUET_COMPRESSION", "zstd")
+
+_LIST_COLUMNS = ("key_points", "followup_points")
+_TIMESTAMP_COLUMNS = ("next_meet_schedule", "created_at", "updated_at")
+
+
+class ExportProgress(RunProgress):
+    """Running totals for an export, updated after every page"""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = 0
+        self.bytes = 0
+
+    @property
+    def rows_done(self):
+        return self.rows
+
+
+def _csv_row(meeting):
+    transcript = meeting.get("transcripts")
+    return [
+        meeting.get("id", ""),
+        meeting.get("title", ""),
+        meeting.get("summary", ""),
+        "; ".join(meeting.get("key_points") or []),
+        "; ".join(meeting.get("followup_points") or []),
+        meeting.get("next_meet_schedule", ""),
+        meeting.get("created_at", ""),
+        meeting.get("updated_at", ""),
+        transcript.get("meeting_title", "") if transcript else "",
+        "From Transcript" if transcript else "Manual Entry",
+    ]
+
+
+def iter_meetings_csv(start_date=None, end_date=None, compress: bool = False,
+                      page_size: int = EXPORT_PAGE_SIZE, progress: ExportProgress = None, on_page=None):
+    """Yield the meetings in a date range as encoded CSV chunks, one chunk per page.
+
+    With compress=True the chunks form a single gzip stream. `progress`
+    is updated as pages are written and `on_page(progress)` is called
+    after each one.
+    """
+    progress = progress or ExportProgress()
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def emit(text):
+        chunk = text.encode("utf-8")
+        if compressor is not None:
+            chunk = compressor.compress(chunk)
+        progress.bytes += len(chunk)
+        return chunk
+
+    writer.writerow(CSV_HEADERS)
+    pages = iter_meeting_pages(page_size, EXPORT_COLUMNS, start_date=start_date, end_date=end_date)
+    for meetings in pages:
+        writer.writerows(_csv_row(meeting) for meeting in meetings)
+        chunk = emit(buffer.getvalue())
+        buffer.seek(0)
+        buffer.truncate()
+        progress.rows += len(meetings)
+        if on_page is not None:
+            on_page(progress)
+        if chunk:
+            yield chunk
+
+    tail = emit(buffer.getvalue())  # the header alone, for an empty range
+    if compressor is not None:
+        flushed = compressor.flush()
+        progress.bytes += len(flushed)
+        tail += flushed
+    if tail:
+        yield tail
+
+
+# --- Typed (Arrow) exports ---
+
+def export_schema():
+    import pyarrow as pa
+
+    timestamp = pa.timestamp("us", tz="UTC")
+    return pa.schema([
+        ("id", pa.string()),
+        ("title", pa.string()),
+        ("summary", pa.string()),
+        ("key_points", pa.list_(pa.string())),
+        ("followup_points", pa.list_(pa.string())),
+        ("next_meet_schedule", timestamp),
+        ("created_at", timestamp),
+        ("updated_at", timestamp),
+        ("original_meeting_title", pa.string()),
+        ("source_type", pa.string()),
+    ])
+
+
+def _parse_timestamp(value):
+    if not value:
+        return None
+    try:
+        # fromisoformat only accepts a trailing "Z" from Python 3.11
+        return datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    except ValueError:
+        return None
+
+
+def _record_batch(meetings, schema):
+    """Turn one page of meeting rows into a typed record batch"""
+    import pyarrow as pa
+
+    columns = {name: [] for name in schema.names}
+    for meeting in meetings:
+        transcript = meeting.get("transcripts")
+        columns["id"].append(str(meeting.get("id", "")))
+        columns["title"].append(meeting.get("title"))
+        columns["summary"].append(meeting.get("summary"))
+        for name in _LIST_COLUMNS:
+            columns[name].append(meeting.get(name) or [])
+        for name in _TIMESTAMP_COLUMNS:
+            columns[name].append(_parse_timestamp(meeting.get(name)))
+        columns["original_meeting_title"].append(transcript.get("meeting_title") if transcript else None)
+        columns["source_type"].append("From Transcript" if transcript else "Manual Entry")
+    return pa.RecordBatch.from_arrays(
+        [pa.array(columns[field.name], type=field.type) for field in schema], schema=schema
+    )
+
+
+def iter_meeting_batches(start_date=None, end_date=None, page_size: int = EXPORT_PAGE_SIZE,
+                         progress: ExportProgress = None, on_page=None):
+    """Yield the meetings in a date range as Arrow record batches, one batch per page"""
+    progress = progress or ExportProgress()
+    schema = export_schema()
+    pages = iter_meeting_pages(page_size, EXPORT_COLUMNS, start_date=start_date, end_date=end_date)
+    for meetings in pages:
+        batch = _record_batch(meetings, schema)
+        progress.rows += batch.num_rows
+        if on_page is not None:
+            on_page(progress)
+        yield batch
+
+
+def _write_csv(path, chunks):
+    with open(path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def _write_parquet(path, batches):
+    import pyarrow.parquet as pq
+
+    with pq.ParquetWriter(path, export_schema(), compression=PARQUET_COMPRESSION) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+def _write_xlsx(path, batches):
+    import xlsxwriter
+
+    # constant_memory flushes each row to disk once the next one starts
+    with xlsxwriter.Workbook(path, {"constant_memory": True, "remove_timezone": True}) as workbook:
+        sheet = workbook.add_worksheet("Meetings")
+        header = workbook.add_format({"bold": True})
+        timestamp = workbook.add_format({"num_format": "yyyy-mm-dd hh:mm"})
+        wrapped = workbook.add_format({"text_wrap": True})
+        sheet.write_row(0, 0, CSV_HEADERS, header)
+        sheet.freeze_panes(1, 0)
+
+        names = export_schema().names
+        row = 1
+        for batch in batches:
+            for record in batch.to_pylist():
+                for col, name in enumerate(names):
+                    value = record[name]
+                    if value is None:
+                        continue
+                    if name in _LIST_COLUMNS:
+                        # Excel has no list type: one point per line within the cell
+                        sheet.write_string(row, col, "\n".join(value), wrapped)
+                    elif name in _TIMESTAMP_COLUMNS:
+                        sheet.write_datetime(row, col, value, timestamp)
+                    else:
+                        sheet.write_string(row, col, value)
+                row += 1
+
+
+def export_meetings_to_file(start_date=None, end_date=None, fmt: str = "csv", compress: bool = False,
+                            on_page=None):
+    """Stream an export in the given format into a temporary file; returns (path, progress).
+
+    `compress` gzips CSV output; Parquet is always compressed internally
+    and XLSX is a zip container already. The caller owns the file and
+    should delete it when done.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    progress = ExportProgress()
+    compress = compress and fmt == "csv"
+    suffix = "." + EXPORT_FORMATS[fmt][0] + (".gz" if compress else "")
+    fd, path = tempfile.mkstemp(prefix="meetings_export_", suffix=suffix)
+    os.close(fd)
+    try:
+        if fmt == "csv":
+            _write_csv(path, iter_meetings_csv(start_date, end_date, compress, progress=progress, on_page=on_page))
+        else:
+            writer = _write_parquet if fmt == "parquet" else _write_xlsx
+            writer(path, iter_meeting_batches(start_date, end_date, progress=progress, on_page=on_page))
+            progress.bytes = os.path.getsize(path)
+    except Exception:
+        os.remove(path)
+        raise
+    progress.finish()
+    return path, progress
@@ -0,0 +1,357 @@
+# job_queue.py
+"""Persistent background queue for transcript summarization.
+
+Jobs live in a small SQLite file so they survive Streamlit restarts. A
+single daemon thread per server process queues new unprocessed meetings
+every JOB_ENQUEUE_INTERVAL seconds and drains the queue, which keeps both
+the backlog scan and model inference off the render path entirely.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from local_store import connect_sqlite
+from search_index import index_transcripts
+from supabase_client import (
+    LOCAL_INDEXES_ENABLED,
+    bulk_update_meetings,
+    fetch_transcripts_by_ids,
+    fetch_unprocessed_meetings,
+)
+from transcript_processor import process_transcripts_for_meetings
+from vector_index import flush_pending as flush_embeddings
+
+JOB_QUEUE_PATH = os.environ.get("JOB_QUEUE_PATH", "transcript_jobs.db")
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "5"))
+JOB_BATCH_SIZE = int(os.environ.get("JOB_BATCH_SIZE", "8"))
+# A running job whose heartbeat is older than this is assumed abandoned
+JOB_LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", "600"))
+# How often the worker looks for new unprocessed meetings, and how many it queues at a time
+JOB_ENQUEUE_INTERVAL = float(os.environ.get("JOB_ENQUEUE_INTERVAL", "30"))
+JOB_ENQUEUE_LIMIT = int(os.environ.get("JOB_ENQUEUE_LIMIT", "500"))
+
+JOB_STATUSES = ("pending", "running", "done", "failed")
+
+_worker_thread = None
+_worker_lock = threading.Lock()
+_wake_event = threading.Event()
+
+
+def _connect():
+    return connect_sqlite(JOB_QUEUE_PATH)
+
+
+def init_queue():
+    """Create the jobs table if it does not exist yet"""
+    with _connect() as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS transcript_jobs (
+                meeting_id TEXT PRIMARY KEY,
+                transcript_id TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_transcript_jobs_status ON transcript_jobs(status)")
+
+
+# --- Queue operations ---
+
+def enqueue_transcript_jobs(meetings):
+    """Queue every meeting that has a transcript but no summary yet"""
+    now = datetime.utcnow().isoformat()
+    rows = [
+        (str(m['id']), str(m['transcript_id']), now, now)
+        for m in meetings
+        if m.get('transcript_id') and not m.get('summary')
+    ]
+    if not rows:
+        return 0
+
+    with _connect() as conn:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO transcript_jobs (meeting_id, transcript_id, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?)",
+            rows
+        )
+        added = conn.total_changes - before
+
+    if added:
+        _wake_event.set()
+    return added
+
+
+def enqueue_backlog(limit: int = None, page_size: int = 500):
+    """Queue unprocessed meetings oldest first; returns the number of new jobs.
+
+    Pages past meetings that already have a job, so meetings whose jobs
+    failed for good don't hide newer ones. Stops once `limit` new jobs
+    were queued or the backlog ends, and raises if a page fails.
+    """
+    added, after = 0, None
+    while limit is None or added < limit:
+        meetings = fetch_unprocessed_meetings(page_size, after).unwrap()
+        added += enqueue_transcript_jobs(meetings)
+        if len(meetings) < page_size:
+            break
+        after = (meetings[-1]["created_at"], meetings[-1]["id"])
+    return added
+
+
+def claim_jobs(limit: int = 1):
+    """Atomically move up to `limit` pending jobs to running"""
+    with _connect() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        jobs = conn.execute(
+            "SELECT meeting_id, transcript_id, attempts FROM transcript_jobs "
+            "WHERE status = 'pending' ORDER BY created_at LIMIT ?",
+            (limit,)
+        ).fetchall()
+        now = datetime.utcnow().isoformat()
+        conn.executemany(
+            "UPDATE transcript_jobs SET status = 'running', attempts = attempts + 1, updated_at = ? "
+            "WHERE meeting_id = ?",
+            [(now, job['meeting_id']) for job in jobs]
+        )
+    return [dict(job) for job in jobs]
+
+
+def complete_job(meeting_id: str):
+    _set_status(meeting_id, "done")
+
+
+def fail_job(meeting_id: str, error: str):
+    _set_status(meeting_id, "failed", error)
+
+
+def _set_status(meeting_id: str, status: str, error: str = None):
+    with _connect() as conn:
+        conn.execute(
+            "UPDATE transcript_jobs SET status = ?, error = ?, updated_at = ? WHERE meeting_id = ?",
+            (status, error, datetime.utcnow().isoformat(), str(meeting_id))
+        )
+
+
+def heartbeat_jobs(meeting_ids):
+    """Renew the lease on running jobs so requeue_stale_jobs() leaves them alone"""
+    with _connect() as conn:
+        conn.executemany(
+            "UPDATE transcript_jobs SET updated_at = ? WHERE meeting_id = ? AND status = 'running'",
+            [(datetime.utcnow().isoformat(), str(meeting_id)) for meeting_id in meeting_ids]
+        )
+
+
+def release_jobs(meeting_ids):
+    """Return claimed jobs to pending without recording a failure"""
+    with _connect() as conn:
+        conn.executemany(
+            "UPDATE transcript_jobs SET status = 'pending', updated_at = ? WHERE meeting_id = ?",
+            [(datetime.utcnow().isoformat(), str(meeting_id)) for meeting_id in meeting_ids]
+        )
+
+
+def retry_failed_jobs():
+    """Move failed jobs back to pending"""
+    with _connect() as conn:
+        cursor = conn.execute(
+            "UPDATE transcript_jobs SET status = 'pending', error = NULL, updated_at = ? WHERE status = 'failed'",
+            (datetime.utcnow().isoformat(),)
+        )
+        retried = cursor.rowcount
+
+    if retried:
+        _wake_event.set()
+    return retried
+
+
+def requeue_stale_jobs(lease_seconds: float = JOB_LEASE_SECONDS):
+    """Return running jobs whose lease expired (their process died) to pending.
+
+    Live workers renew their lease with a heartbeat, so jobs held by the
+    dashboard or a process_backlog.py run in progress are left alone.
+    """
+    now = datetime.utcnow()
+    expired = (now - timedelta(seconds=lease_seconds)).isoformat()
+    with _connect() as conn:
+        cursor = conn.execute(
+            "UPDATE transcript_jobs SET status = 'pending', updated_at = ? "
+            "WHERE status = 'running' AND updated_at < ?",
+            (now.isoformat(), expired)
+        )
+        return cursor.rowcount
+
+
+def get_queue_status():
+    """Return job counts per status"""
+    status = {name: 0 for name in JOB_STATUSES}
+    with _connect() as conn:
+        for row in conn.execute("SELECT status, COUNT(*) AS n FROM transcript_jobs GROUP BY status"):
+            status[row['status']] = row['n']
+    status["total"] = sum(status[name] for name in JOB_STATUSES)
+    return status
+
+
+def get_failed_jobs(limit: int = 20):
+    """Return the most recent failed jobs with their error messages"""
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT meeting_id, transcript_id, attempts, error, updated_at FROM transcript_jobs "
+            "WHERE status = 'failed' ORDER BY updated_at DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+# --- Worker ---
+
+class JobsDeferred(Exception):
+    """The batch couldn't run for a transient reason and should be retried later"""
+
+
+def process_jobs(jobs):
+    """Summarize a batch of transcripts and write results back to their meetings.
+
+    Uses one query to fetch every transcript and one upsert to save every
+    meeting, so round trips stay constant regardless of batch size.
+    """
+    result = fetch_transcripts_by_ids([job['transcript_id'] for job in jobs])
+    if result.failed:
+        # An outage is not the same as missing transcripts; don't fail the jobs
+        raise JobsDeferred(f"Could not fetch transcripts: {result.error}")
+    transcripts_by_id = {str(row['id']): row for row in result.data}
+
+    transcripts = {}
+    for job in jobs:
+        transcript = transcripts_by_id.get(job['transcript_id'])
+        if transcript:
+            transcripts[job['meeting_id']] = transcript
+        else:
+            fail_job(job['meeting_id'], "Transcript not found")
+
+    processed, timings = process_transcripts_for_meetings(transcripts)
+    if timings:
+        print(
+            f"Summarized {timings['texts']} transcript(s) in {timings['chunks']} chunk(s): "
+            f"map {timings['map']:.1f}s, reduce {timings['reduce']:.1f}s, total {timings['total']:.1f}s"
+        )
+
+    for meeting_id in transcripts:
+        if meeting_id not in processed:
+            fail_job(meeting_id, "Transcript has no text")
+
+    updates = [
+        {
+            "id": meeting_id,
+            "title": data['title'],
+            "summary": data['summary'],
+            "key_points": data['key_points'],
+            "followup_points": data['followup_points'],
+            "next_meet_schedule": data['next_meet_schedule'],
+        }
+        for meeting_id, data in processed.items()
+    ]
+    if not updates:
+        return 0
+
+    result = bulk_update_meetings(updates)
+    if result.failed:
+        for meeting_id in processed:
+            fail_job(meeting_id, "Error updating meeting")
+        return 0
+
+    # Meetings deleted after their job was claimed are skipped, not re-created
+    for meeting_id in list(processed):
+        if str(meeting_id) in result.data:
+            complete_job(meeting_id)
+        else:
+            fail_job(meeting_id, "Meeting no longer exists")
+            del processed[meeting_id]
+    if not LOCAL_INDEXES_ENABLED:
+        return len(processed)
+
+    try:
+        index_transcripts({meeting_id: transcripts[meeting_id] for meeting_id in processed})
+    except Exception as e:
+        print(f"Error updating search index: {e}")
+
+    # The bulk update queued these meetings for embedding; do it here in one batch
+    try:
+        flush_embeddings()
+    except Exception as e:
+        print(f"Error updating vector index: {e}")
+    return len(processed)
+
+
+def _heartbeat(meeting_ids, stop):
+    # Renew well within the lease so a slow batch is never mistaken for a dead one
+    while not stop.wait(JOB_LEASE_SECONDS / 3):
+        try:
+            heartbeat_jobs(meeting_ids)
+        except Exception as e:
+            print(f"Error renewing job lease: {e}")
+
+
+def run_claimed_jobs(jobs):
+    """Process claimed jobs, recording failures on the jobs themselves.
+
+    Holds the jobs' lease with a heartbeat while they run. Returns the
+    number of meetings processed, or None if the batch was deferred and
+    its jobs went back to pending.
+    """
+    meeting_ids = [job['meeting_id'] for job in jobs]
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(meeting_ids, stop), name="job-heartbeat", daemon=True).start()
+    try:
+        return process_jobs(jobs)
+    except JobsDeferred as e:
+        print(f"Deferring transcript jobs: {e}")
+        release_jobs(meeting_ids)
+        return None
+    except Exception as e:
+        print(f"Error processing transcript jobs: {e}")
+        for meeting_id in meeting_ids:
+            fail_job(meeting_id, str(e))
+        return 0
+    finally:
+        stop.set()
+
+
+def _worker_loop():
+    last_enqueue = None
+    while True:
+        try:
+            # Finding new work lives here, off the render path, at a bounded rate
+            if last_enqueue is None or time.monotonic() - last_enqueue >= JOB_ENQUEUE_INTERVAL:
+                last_enqueue = time.monotonic()
+                enqueue_backlog(JOB_ENQUEUE_LIMIT)
+            jobs = claim_jobs(JOB_BATCH_SIZE)
+            busy = bool(jobs) and run_claimed_jobs(jobs) is not None
+            if not busy:
+                # Pick up jobs abandoned by a crashed process while idle
+                requeue_stale_jobs()
+        except Exception as e:
+            # e.g. "database is locked" while a backfill holds the queue; never let the thread die
+            print(f"Error in transcript worker: {e}")
+            busy = False
+        if not busy:
+            _wake_event.wait(JOB_POLL_INTERVAL)
+            _wake_event.clear()
+
+
+def start_worker():
+    """Start the background worker once per process"""
+    global _worker_thread
+    with _worker_lock:
+        if _worker_thread is not None and _worker_thread.is_alive():
+            return _worker_thread
+
+        init_queue()
+        requeue_stale_jobs()
+        _worker_thread = threading.Thread(target=_worker_loop, name="transcript-worker", daemon=True)
+        _worker_thread.start()
+        return _worker_thread
@@ -0,0 +1,115 @@
+# local_store.py
+"""Helpers for the state the app keeps in local files.
+
+The job queue, the summary cache and the archive index are small SQLite
+files opened per operation; the search and vector indexes are written
+to disk a few seconds after a burst of changes and once more on exit.
+"""
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+@contextmanager
+def connect_sqlite(path, schema=()):
+    """Open a connection that commits on success and always closes.
+
+    Rows come back as sqlite3.Row. The `schema` statements (CREATE ...
+    IF NOT EXISTS) run on every connection, so a file deleted while the
+    app runs is simply recreated.
+    """
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        with conn:
+            for statement in schema:
+                conn.execute(statement)
+            yield conn
+    finally:
+        conn.close()
+
+
+def file_mtime(path):
+    """Modification time of a file in nanoseconds, or None if it doesn't exist"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class DebouncedSave:
+    """Run `save` once, `delay` seconds after the first of a burst of changes.
+
+    A save still pending when the process exits runs then instead.
+    """
+
+    def __init__(self, save, delay: float):
+        self._save = save
+        self._delay = delay
+        self._timer = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def schedule(self):
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self._delay, self._run)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _run(self):
+        with self._lock:
+            self._timer = None
+        self._save()
+
+    def flush(self):
+        """Save now if a save is pending"""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+            self._save()
+
+
+class BackgroundBuild:
+    """Run `build` in a daemon thread, one run at a time.
+
+    After a failure start() does nothing for `retry_after` seconds, so an
+    outage doesn't turn every caller into another full build.
+    """
+
+    def __init__(self, build, name: str, retry_after: float):
+        self._build = build
+        self._name = name
+        self._retry_after = retry_after
+        self._thread = None
+        self._failed_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def start(self):
+        """Start a build unless one is running or the last one failed recently"""
+        with self._lock:
+            if self.running:
+                return False
+            if self._failed_at is not None and time.monotonic() - self._failed_at < self._retry_after:
+                return False
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self):
+        try:
+            self._build()
+        except Exception as e:
+            print(f"Error in {self._name}, retrying in {self._retry_after:.0f}s at the earliest: {e}")
+            self._failed_at = time.monotonic()
+        else:
+            self._failed_at = None
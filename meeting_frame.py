@@ -0,0 +1,140 @@
+# meeting_frame.py
+"""Columnar view model for meeting lists.
+
+Meeting rows are loaded into a pandas DataFrame once, with datetimes
+parsed and the display columns (source, formatted dates, key point
+preview, size) computed as vectorized operations over the whole frame.
+Frames are cached against the row list they were built from, and those
+lists are the objects held by the query cache, so a frame lives exactly
+as long as the data behind it and is rebuilt when a write invalidates it.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from supabase_client import (
+    KEY_POINT_PREVIEW_CHARS,
+    MEETING_CARD_COLUMNS,
+    MEETINGS_PAGE_SIZE,
+    fetch_meeting_card_rows_by_ids,
+    fetch_meetings_page,
+)
+
+FRAME_CACHE_SIZE = 64
+MEETING_WINDOW_SIZE = int(os.environ.get("MEETING_WINDOW_SIZE", "10"))
+DATETIME_FORMAT = "%Y-%m-%d %H:%M"
+
+FRAME_COLUMNS = [
+    "id", "title", "transcript_id", "created_at", "updated_at",
+    "created_label", "updated_label", "is_automatic", "source", "key_points_preview",
+]
+
+_frames = OrderedDict()  # id(rows) -> (rows, frame)
+_frames_lock = threading.Lock()
+
+
+def _truncate(points):
+    long = points.str.len() > KEY_POINT_PREVIEW_CHARS
+    return points.where(~long, points.str.slice(0, KEY_POINT_PREVIEW_CHARS) + "...")
+
+
+def _column(frame, name):
+    if name in frame:
+        return frame[name]
+    return pd.Series(np.nan, index=frame.index, dtype=object)
+
+
+def build_meeting_frame(rows):
+    """Build the view model frame for a list of meeting rows, indexed by id as str"""
+    if not rows:
+        return pd.DataFrame(columns=FRAME_COLUMNS)
+
+    frame = pd.DataFrame.from_records(rows)
+    frame.index = frame["id"].astype(str)
+    frame["title"] = _column(frame, "title").fillna("Untitled Meeting")
+    frame["transcript_id"] = _column(frame, "transcript_id")
+
+    for column in ("created_at", "updated_at"):
+        # PostgREST trims trailing zeros, so rows differ in fractional-second digits
+        frame[column] = pd.to_datetime(_column(frame, column), utc=True, errors="coerce", format="ISO8601")
+    frame["created_label"] = frame["created_at"].dt.strftime(DATETIME_FORMAT).fillna("")
+    frame["updated_label"] = frame["updated_at"].dt.strftime(DATETIME_FORMAT).fillna("")
+    if "next_meet_schedule" in frame:
+        frame["next_meet_schedule"] = pd.to_datetime(
+            frame["next_meet_schedule"], utc=True, errors="coerce", format="ISO8601"
+        )
+
+    frame["is_automatic"] = frame["transcript_id"].notna()
+    frame["source"] = np.where(frame["is_automatic"], "Automatic", "Manual")
+
+    # Full rows carry the key_points list; card rows carry the first three points
+    if "key_points" in frame:
+        key_points = frame["key_points"]
+        first, second, third = (key_points.str[i] for i in range(3))
+    else:
+        first, second, third = (_column(frame, f"key_point_{i}") for i in (1, 2, 3))
+    first, second = _truncate(first), _truncate(second)
+    preview = pd.Series(
+        np.where(first.notna() & second.notna(), first + " • " + second, first.fillna(second).fillna("")),
+        index=frame.index,
+    )
+    frame["key_points_preview"] = preview + np.where(third.notna() & (preview != ""), " • +more", "")
+
+    if "summary" in frame:
+        key_points_text = _column(frame, "key_points").map(lambda points: str(points) if isinstance(points, list) else "")
+        frame["size_chars"] = frame["summary"].fillna("").astype(str).str.len() + key_points_text.str.len()
+    return frame
+
+
+def meeting_frame(rows):
+    """Return the frame for rows, building it only the first time this list is seen"""
+    key = id(rows)
+    with _frames_lock:
+        entry = _frames.get(key)
+        if entry is not None and entry[0] is rows:
+            _frames.move_to_end(key)
+            return entry[1]
+
+    frame = build_meeting_frame(rows)
+
+    with _frames_lock:
+        # Keep a reference to rows so its id can't be reused while cached
+        _frames[key] = (rows, frame)
+        _frames.move_to_end(key)
+        while len(_frames) > FRAME_CACHE_SIZE:
+            _frames.popitem(last=False)
+    return frame
+
+
+def frame_window(frame, start: int, size: int = MEETING_WINDOW_SIZE):
+    """Return (rows start..start+size, clamped start) so only the visible slice is rendered"""
+    start = max(0, min(start, (len(frame) - 1) // size * size if len(frame) else 0))
+    return frame.iloc[start:start + size], start
+
+
+def fetch_meeting_cards_frame(page_size: int = MEETINGS_PAGE_SIZE, cursor: tuple = None,
+                              search: str = None, start_date=None, end_date=None):
+    """Fetch one page of meeting cards as a frame; returns a QueryResult of (frame, next_cursor)"""
+    result = fetch_meetings_page(
+        page_size, cursor, columns=MEETING_CARD_COLUMNS,
+        search=search, start_date=start_date, end_date=end_date
+    )
+    return result.map(lambda page: (meeting_frame(page[0]), page[1]))
+
+
+def fetch_meeting_cards_frame_by_ids(meeting_ids: list, start_date=None, end_date=None):
+    """Fetch meeting cards for the given ids as a frame in the order of meeting_ids (a QueryResult)"""
+    def select(rows):
+        frame = meeting_frame(rows)
+        order = pd.Index([str(meeting_id) for meeting_id in meeting_ids])
+        return frame.loc[order[order.isin(frame.index)]]
+
+    return fetch_meeting_card_rows_by_ids(meeting_ids, start_date, end_date).map(select)
+
+
+def fetch_recent_meetings_frame(limit: int = 10):
+    """Fetch the newest meetings with full columns as a frame (a QueryResult)"""
+    return fetch_meetings_page(page_size=limit).map(lambda page: meeting_frame(page[0]))
@@ -0,0 +1,82 @@
+# model_registry.py
+"""Process-wide registry for the summarization model.
+
+Streamlit imports this module once per server process, so every browser
+session shares the same loaded pipeline instead of keeping its own copy
+in st.session_state.
+"""
+import gc
+import os
+import threading
+
+from summarizer_backends import DEFAULT_BACKEND, get_backend
+
+# --- Configuration from environment variables ---
+SUMMARIZER_BACKEND = os.environ.get("SUMMARIZER_BACKEND", DEFAULT_BACKEND)
+SUMMARIZER_MAX_CONCURRENCY = int(os.environ.get("SUMMARIZER_MAX_CONCURRENCY", "1"))
+
+_models = {}
+_load_lock = threading.Lock()
+_inference_slots = threading.BoundedSemaphore(SUMMARIZER_MAX_CONCURRENCY)
+
+
+def get_summarizer(backend_name: str = SUMMARIZER_BACKEND):
+    """Return the shared summarization pipeline, loading it on first use"""
+    summarizer = _models.get(backend_name)
+    if summarizer is not None:
+        return summarizer
+
+    with _load_lock:
+        # Another session may have finished loading while we waited
+        summarizer = _models.get(backend_name)
+        if summarizer is None:
+            try:
+                summarizer = get_backend(backend_name).load()
+            except Exception as e:
+                print(f"Error loading summarization model: {e}")
+                return None
+            _models[backend_name] = summarizer
+        return summarizer
+
+
+def summarize(text, backend_name: str = SUMMARIZER_BACKEND, **generate_kwargs):
+    """Run the shared summarizer with bounded concurrency"""
+    summarizer = get_summarizer(backend_name)
+    if summarizer is None:
+        return None
+
+    with _inference_slots:
+        return summarizer(text, **generate_kwargs)
+
+
+def get_model_version(backend_name: str = SUMMARIZER_BACKEND):
+    """Identifier of the checkpoint and precision behind a backend"""
+    return get_backend(backend_name).version
+
+
+def is_loaded(backend_name: str = SUMMARIZER_BACKEND):
+    """Check whether a model is currently held in memory"""
+    return backend_name in _models
+
+
+def unload_summarizer(backend_name: str = SUMMARIZER_BACKEND):
+    """Drop the shared model so its memory can be reclaimed"""
+    with _load_lock:
+        # Wait for in-flight inference so we never free a model mid-call
+        for _ in range(SUMMARIZER_MAX_CONCURRENCY):
+            _inference_slots.acquire()
+        try:
+            removed = _models.pop(backend_name, None) is not None
+        finally:
+            for _ in range(SUMMARIZER_MAX_CONCURRENCY):
+                _inference_slots.release()
+
+    if removed:
+        gc.collect()
+    return removed
+
+
+def reload_summarizer(backend_name: str = SUMMARIZER_BACKEND):
+    """Unload and immediately load a fresh copy of the model"""
+    unload_summarizer(backend_name)
+    return get_summarizer(backend_name)
@@ -0,0 +1,149 @@
+# process_backlog.py
+"""Summarize the transcript backlog from the command line.
+
+Runs the same pipeline as the dashboard's background worker without
+Streamlit: unprocessed meetings are queued in the shared SQLite job
+queue and drained by N worker processes, each with its own copy of the
+summarizer. Jobs are claimed atomically, so this can run next to the
+dashboard (or another backfill) without doing work twice.
+
+    python process_backlog.py --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+
+# Set before the project imports: worker processes (which inherit the
+# environment) would otherwise overwrite each other's local index files
+os.environ.setdefault("LOCAL_INDEXES_ENABLED", "0")
+
+from job_queue import (  # noqa: E402
+    JOB_BATCH_SIZE,
+    JOB_POLL_INTERVAL,
+    claim_jobs,
+    enqueue_backlog,
+    get_queue_status,
+    init_queue,
+    requeue_stale_jobs,
+    run_claimed_jobs,
+)
+from supabase_client import query_cache  # noqa: E402
+
+MAX_DEFERRALS = 3
+PROGRESS_INTERVAL = 2.0
+
+
+def _init_worker(threads: int):
+    # Split the cores between workers instead of every worker using all of them
+    import torch
+
+    torch.set_num_threads(threads)
+
+
+def _drain_queue(batch_size: int):
+    """Worker process: claim and process batches until the queue is empty"""
+    processed = 0
+    deferrals = 0
+    while True:
+        jobs = claim_jobs(batch_size)
+        if not jobs:
+            return processed
+        result = run_claimed_jobs(jobs)
+        if result is None:
+            # The database is unreachable; leave the jobs pending for a later run
+            deferrals += 1
+            if deferrals >= MAX_DEFERRALS:
+                return processed
+            time.sleep(JOB_POLL_INTERVAL)
+        else:
+            processed += result
+
+
+def _queue_next_round(limit: int):
+    """Queue up to `limit` unprocessed meetings without a job yet; returns the number queued"""
+    # Workers in other processes don't invalidate this process's cache
+    query_cache.invalidate("meetings")
+    return enqueue_backlog(limit)
+
+
+def _print_progress(status, baseline, started):
+    done = status["done"] - baseline["done"]
+    failed = status["failed"] - baseline["failed"]
+    elapsed = time.monotonic() - started
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(
+        f"[{elapsed:7.1f}s] {done} done, {failed} failed, {status['pending']} pending, "
+        f"{status['running']} running ({rate:.2f} meetings/s)",
+        flush=True,
+    )
+
+
+def process_backlog(workers: int, batch_size: int = JOB_BATCH_SIZE, limit: int = 500):
+    """Drain the backlog with `workers` processes; returns (done, failed) for this run"""
+    init_queue()
+    # Only jobs whose lease expired; the dashboard's worker keeps renewing its own
+    requeue_stale_jobs()
+    baseline = get_queue_status()
+    started = time.monotonic()
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(threads,)) as pool:
+        while True:
+            added = _queue_next_round(limit)
+            if not get_queue_status()["pending"]:
+                break
+            print(f"Queued {added} new meeting(s)", flush=True)
+
+            futures = [pool.submit(_drain_queue, batch_size) for _ in range(workers)]
+            while True:
+                finished, running = wait(futures, timeout=PROGRESS_INTERVAL, return_when=FIRST_EXCEPTION)
+                _print_progress(get_queue_status(), baseline, started)
+                if not running:
+                    break
+            for future in finished:
+                future.result()  # re-raise a worker crash
+
+            if not added:
+                # Every unprocessed meeting already has a job, so whatever is still pending was deferred
+                break
+
+    status = get_queue_status()
+    _print_progress(status, baseline, started)
+    return status["done"] - baseline["done"], status["failed"] - baseline["failed"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize unprocessed meeting transcripts without the dashboard")
+    parser.add_argument("--workers", type=int, default=2, help="Number of worker processes")
+    parser.add_argument("--batch-size", type=int, default=JOB_BATCH_SIZE, help="Transcripts per batch")
+    parser.add_argument("--limit", type=int, default=500, help="Meetings to queue per round")
+    parser.add_argument(
+        "--rebuild-indexes", action="store_true",
+        help="Rebuild the local search and semantic indexes afterwards (workers don't update them). "
+             "A running dashboard reloads the rebuilt files instead of overwriting them."
+    )
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    done, failed = process_backlog(args.workers, args.batch_size, args.limit)
+    print(f"Finished: {done} meeting(s) summarized, {failed} failed")
+
+    if args.rebuild_indexes and done:
+        from search_index import rebuild_index
+        from vector_index import rebuild_vector_index
+
+        print("Rebuilding search index...", flush=True)
+        rebuild_index()
+        print("Rebuilding semantic index...", flush=True)
+        rebuild_vector_index()
+    elif done:
+        print("Local search indexes were not updated; rebuild them with --rebuild-indexes or from the dashboard.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,34 @@
+# progress.py
+"""Timing and throughput shared by the reports of long-running jobs.
+
+Each report keeps its own counters; this base class adds the start and
+finish times and rows per second on top. Subclasses say which counter
+is the row count by implementing `rows_done`.
+"""
+import abc
+import time
+
+
+class RunProgress(abc.ABC):
+    """Elapsed time and throughput of a run, frozen once finish() is called"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.finished = None
+
+    @property
+    @abc.abstractmethod
+    def rows_done(self):
+        """Rows handled so far, the basis of rows_per_second"""
+
+    def finish(self):
+        self.finished = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed
+        return self.rows_done / elapsed if elapsed > 0 else 0.0
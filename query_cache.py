@@ -0,0 +1,109 @@
+# query_cache.py
+"""Process-wide read-through cache for Supabase queries.
+
+Entries expire after a TTL, the cache holds a bounded number of entries
+(least recently used go first), and every entry carries tags so writes
+can invalidate exactly the results they affect. Cached values are shared
+between sessions and must be treated as read-only.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryCache:
+    """Thread-safe TTL + LRU cache with tag-based invalidation"""
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, tags, value)
+        self._lock = threading.Lock()
+        # Bumped by invalidate() (per tag) and clear() while loads are in
+        # flight, so a load that raced a write isn't stored afterwards
+        self._generations = {}
+        self._epoch = 0
+        self._loading = 0
+        self._stats = {
+            "hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0, "discards": 0,
+        }
+
+    def get_or_load(self, key, loader, tags=(), ttl: float = None):
+        """Return the cached value for key, calling loader() on a miss.
+
+        Exceptions from loader propagate and nothing is cached, so a
+        failed query is never served as an empty result. `ttl` overrides
+        the cache-wide TTL for this entry. If one of the entry's tags is
+        invalidated while loader() runs, the value is returned but not
+        cached, since it may predate the write.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry[2]
+                del self._entries[key]
+                self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            tags = frozenset(tags)
+            generations = {tag: self._generations.get(tag, 0) for tag in tags}
+            epoch = self._epoch
+            self._loading += 1
+
+        try:
+            value = loader()
+        finally:
+            with self._lock:
+                stale = epoch != self._epoch or any(
+                    self._generations.get(tag, 0) != generation for tag, generation in generations.items()
+                )
+                self._loading -= 1
+                if not self._loading:
+                    # No load holds a snapshot any more
+                    self._generations.clear()
+
+        if stale:
+            with self._lock:
+                self._stats["discards"] += 1
+            return value
+
+        with self._lock:
+            expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+            self._entries[key] = (expires_at, tags, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return value
+
+    def invalidate(self, *tags):
+        """Drop every entry carrying any of the given tags"""
+        tags = set(tags)
+        with self._lock:
+            if self._loading:
+                for tag in tags:
+                    self._generations[tag] = self._generations.get(tag, 0) + 1
+            stale = [key for key, (_, entry_tags, _) in self._entries.items() if entry_tags & tags]
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidations"] += len(stale)
+        return len(stale)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._epoch += 1
+            self._stats["invalidations"] += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss/eviction counters and the current entry count"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
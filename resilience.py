@@ -0,0 +1,175 @@
+# resilience.py
+"""Failure handling for database calls.
+
+QueryResult tells an empty answer apart from a failed query, so callers
+never mistake an outage for an empty table. Idempotent reads are retried
+with jittered exponential backoff, and a circuit breaker stops sending
+requests for a while once transient failures pile up, so an outage fails
+fast instead of stacking timeouts.
+"""
+import random
+import threading
+import time
+
+import httpx
+
+# PostgREST codes for "could not reach or talk to the database"
+_TRANSIENT_POSTGREST_CODES = {"PGRST000", "PGRST001", "PGRST002", "PGRST003"}
+# Gateway/proxy HTTP statuses in front of PostgREST
+_TRANSIENT_HTTP_STATUSES = {502, 503, 504}
+
+# postgrest-py's message for an error response whose body isn't JSON (e.g. a
+# gateway's HTML error page); only then does its `code` carry the HTTP status
+_NON_JSON_ERROR_MESSAGE = "JSON could not be generated"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the database while the circuit is open"""
+
+
+class QueryResult:
+    """Outcome of a query: `data` on success, `error` on failure"""
+
+    __slots__ = ("data", "error")
+
+    def __init__(self, data=None, error=None):
+        self.data = data
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def failed(self):
+        return self.error is not None
+
+    @property
+    def is_empty(self):
+        """True only for a successful query that returned nothing"""
+        return self.ok and not self.data
+
+    def unwrap(self):
+        """Return the data, or raise the error the query failed with"""
+        if self.error is not None:
+            raise self.error
+        return self.data
+
+    def map(self, fn):
+        """Apply fn to the data of a successful result; failures pass through"""
+        return QueryResult(fn(self.data)) if self.ok else self
+
+    def __repr__(self):
+        if self.ok:
+            return f"QueryResult(data={self.data!r})"
+        return f"QueryResult(error={self.error!r})"
+
+
+def is_transient(exc):
+    """Whether an error is worth retrying (timeouts, dropped connections, 5xx)"""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    status = _http_status(exc)
+    if status is not None:
+        return status in _TRANSIENT_HTTP_STATUSES
+    # Otherwise `code` is a PostgREST code or a Postgres SQLSTATE, never an HTTP status
+    return str(getattr(exc, "code", "")) in _TRANSIENT_POSTGREST_CODES
+
+
+def _http_status(exc):
+    """The HTTP status an error reports, or None if it doesn't carry one"""
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status
+    code = str(getattr(exc, "code", ""))
+    if getattr(exc, "message", None) == _NON_JSON_ERROR_MESSAGE and code.isdigit():
+        return int(code)
+    return None
+
+
+class CircuitBreaker:
+    """Open after `failure_threshold` consecutive transient failures.
+
+    While open, calls fail immediately with CircuitOpenError. After
+    `reset_timeout` seconds one trial call is let through (half-open);
+    success closes the circuit and failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                raise CircuitOpenError("Database circuit is open; failing fast")
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def record_neutral(self):
+        """The call finished with an error that says nothing about availability"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def stats(self):
+        state = self.state
+        with self._lock:
+            return {"state": state, "consecutive_failures": self._failures}
+
+
+def call_with_retry(fn, attempts: int = 3, base_delay: float = 0.2, max_delay: float = 2.0, breaker=None):
+    """Call fn(), retrying transient errors with full-jitter exponential backoff.
+
+    Only pass idempotent calls with attempts > 1. Non-transient errors
+    are raised at once. With a breaker, every attempt is gated by it and
+    reports its outcome to it.
+    """
+    for attempt in range(attempts):
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            result = fn()
+        except Exception as e:
+            transient = is_transient(e)
+            if breaker is not None:
+                if transient:
+                    breaker.record_failure()
+                else:
+                    breaker.record_neutral()
+            if not transient or attempt == attempts - 1:
+                raise
+            time.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
@@ -0,0 +1,135 @@
+# retention.py
+"""Bounded, resumable deletion of old meetings and transcripts.
+
+Rows older than the cutoff are deleted in id-ordered batches, so no
+single statement runs long or holds locks on a large range. Meetings go
+first because they reference transcripts; a transcript still used by a
+newer meeting is kept rather than left dangling. After every batch the
+position is checkpointed to a small JSON file, and a run for the same
+cutoff picks up where a failed one stopped. A dry run walks the same
+batches without deleting anything and reports what would go.
+"""
+import json
+import os
+
+from progress import RunProgress
+from supabase_client import (
+    delete_meetings_by_ids,
+    delete_transcripts_by_ids,
+    fetch_expired_ids,
+    fetch_referenced_transcript_ids,
+)
+
+RETENTION_BATCH_SIZE = int(os.environ.get("RETENTION_BATCH_SIZE", "500"))
+RETENTION_CHECKPOINT_PATH = os.environ.get("RETENTION_CHECKPOINT_PATH", "retention_checkpoint.json")
+
+# Deletion order: meetings reference transcripts
+PHASES = ("meetings", "transcripts")
+
+
+class RetentionReport(RunProgress):
+    """Exact per-table counts and throughput of a retention run"""
+
+    def __init__(self, cutoff_date, dry_run: bool = False):
+        super().__init__()
+        self.cutoff_date = cutoff_date
+        self.dry_run = dry_run
+        self.deleted = {phase: 0 for phase in PHASES}
+        self.kept_referenced = 0  # old transcripts still used by newer meetings
+        self.batches = 0
+        self.resumed = False
+
+    @property
+    def total(self):
+        return sum(self.deleted.values())
+
+    @property
+    def rows_done(self):
+        return self.total
+
+
+# --- Checkpoint ---
+
+def load_checkpoint(cutoff_date):
+    """Return the saved position for this cutoff, or None"""
+    try:
+        with open(RETENTION_CHECKPOINT_PATH, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return checkpoint if checkpoint.get("cutoff_date") == cutoff_date else None
+
+
+def _save_checkpoint(report, phase, after_id):
+    checkpoint = {
+        "cutoff_date": report.cutoff_date,
+        "phase": phase,
+        "after_id": after_id,
+        "deleted": report.deleted,
+        "kept_referenced": report.kept_referenced,
+        "batches": report.batches,
+    }
+    with open(RETENTION_CHECKPOINT_PATH + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(RETENTION_CHECKPOINT_PATH + ".tmp", RETENTION_CHECKPOINT_PATH)
+
+
+def clear_checkpoint():
+    if os.path.exists(RETENTION_CHECKPOINT_PATH):
+        os.remove(RETENTION_CHECKPOINT_PATH)
+
+
+# --- Engine ---
+
+def _batch_targets(phase, ids, cutoff_date, report):
+    """The ids in a batch that may actually be deleted"""
+    if phase != "transcripts":
+        return ids
+    referenced = fetch_referenced_transcript_ids(ids, cutoff_date)
+    report.kept_referenced += len(referenced)
+    return [transcript_id for transcript_id in ids if str(transcript_id) not in referenced]
+
+
+def run_retention(cutoff_date: str, dry_run: bool = False, batch_size: int = RETENTION_BATCH_SIZE,
+                  on_batch=None):
+    """Delete meetings, then unreferenced transcripts, created before cutoff_date.
+
+    Returns a RetentionReport; `on_batch(report)` is called after every
+    batch. Raises if a batch fails, leaving the checkpoint in place so
+    the next run for the same cutoff resumes from it.
+    """
+    report = RetentionReport(cutoff_date, dry_run)
+    start_phase, after_id = PHASES[0], None
+
+    checkpoint = None if dry_run else load_checkpoint(cutoff_date)
+    if checkpoint:
+        start_phase, after_id = checkpoint["phase"], checkpoint["after_id"]
+        report.deleted.update(checkpoint["deleted"])
+        report.kept_referenced = checkpoint["kept_referenced"]
+        report.batches = checkpoint["batches"]
+        report.resumed = True
+
+    delete = {"meetings": delete_meetings_by_ids, "transcripts": delete_transcripts_by_ids}
+    for phase in PHASES[PHASES.index(start_phase):]:
+        if phase != start_phase:
+            after_id = None
+        while True:
+            ids = fetch_expired_ids(phase, cutoff_date, after_id, batch_size)
+            if not ids:
+                break
+            targets = _batch_targets(phase, ids, cutoff_date, report)
+            if dry_run:
+                report.deleted[phase] += len(targets)
+            else:
+                report.deleted[phase] += delete[phase](targets)
+            after_id = ids[-1]
+            report.batches += 1
+            if not dry_run:
+                _save_checkpoint(report, phase, after_id)
+            if on_batch is not None:
+                on_batch(report)
+
+    if not dry_run:
+        clear_checkpoint()
+    report.finish()
+    return report
@@ -0,0 +1,411 @@
+# search_index.py
+"""Local full-text search over meetings and their transcripts.
+
+An inverted index maps each term to a compact posting list of
+(document, term frequency) pairs, stored as delta-encoded varints in a
+bytearray. Queries are ranked with BM25 and the last query term is
+prefix-matched so results update while the user types.
+
+Each meeting is one document and each transcript is another document
+that points back to its meeting, so hits inside transcript text surface
+the meeting. The index is updated incrementally by the write functions
+in supabase_client.py and persisted to disk so startup doesn't rebuild;
+when there is no index file yet it is built from the database in the
+background on first use.
+"""
+import bisect
+import heapq
+import math
+import os
+import pickle
+import re
+import threading
+from array import array
+from collections import Counter, defaultdict
+
+from local_store import BackgroundBuild, DebouncedSave, file_mtime
+
+SEARCH_INDEX_PATH = os.environ.get("SEARCH_INDEX_PATH", "search_index.pkl")
+SEARCH_INDEX_SAVE_DELAY = float(os.environ.get("SEARCH_INDEX_SAVE_DELAY", "10"))
+# Seconds to wait after a failed initial build before trying again
+SEARCH_INDEX_BUILD_RETRY = float(os.environ.get("SEARCH_INDEX_BUILD_RETRY", "300"))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+PREFIX_EXPANSIONS = 20
+TITLE_BOOST = 2
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have i in is it its of on or so that the this
+to was we were will with you your our they them he she his her not do does did
+""".split())
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """Lowercase word tokens with stopwords and single characters removed"""
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def _encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_postings(buf):
+    """Yield (doc number, term frequency) pairs from a delta-encoded posting list"""
+    doc, pos, n = 0, 0, len(buf)
+    while pos < n:
+        values = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                byte = buf[pos]
+                pos += 1
+                result |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    break
+                shift += 7
+            values.append(result)
+        doc += values[0]
+        yield doc, values[1]
+
+
+class InvertedIndex:
+    """BM25-ranked inverted index with tombstone deletes and prefix search"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}        # term -> bytearray of (doc delta, tf) varints
+        self._last_doc = {}        # term -> last doc number appended to its postings
+        self._df = Counter()       # term -> number of live documents containing it
+        self._doc_keys = []        # doc number -> document key, None once deleted
+        self._doc_meeting = []     # doc number -> meeting id the document belongs to
+        self._doc_lengths = array("I")
+        self._doc_terms = []       # doc number -> distinct terms, to keep df exact on delete
+        self._key_to_doc = {}      # document key -> live doc number
+        self._total_length = 0
+        self._deleted = 0
+        self._vocab = []
+        self._vocab_dirty = False
+
+    # --- Updates ---
+
+    def add(self, key, meeting_id, text):
+        """Index a document, replacing any earlier version with the same key"""
+        with self._lock:
+            self._remove(key)
+            tokens = tokenize(text)
+            counts = Counter(tokens)
+
+            doc = len(self._doc_keys)
+            self._doc_keys.append(key)
+            self._doc_meeting.append(meeting_id)
+            self._doc_lengths.append(len(tokens))
+            self._doc_terms.append(tuple(counts))
+            self._key_to_doc[key] = doc
+            self._total_length += len(tokens)
+
+            for term, tf in counts.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = bytearray()
+                    self._vocab_dirty = True
+                _encode_varint(doc - self._last_doc.get(term, 0), postings)
+                _encode_varint(tf, postings)
+                self._last_doc[term] = doc
+                self._df[term] += 1
+            # Re-adding a key leaves a tombstone just like remove() does
+            self._maybe_compact()
+
+    def remove(self, key):
+        """Drop a document from the index"""
+        with self._lock:
+            removed = self._remove(key)
+            self._maybe_compact()
+            return removed
+
+    def _maybe_compact(self):
+        if self._deleted > 1000 and self._deleted > len(self._key_to_doc):
+            self._compact()
+
+    def _remove(self, key):
+        doc = self._key_to_doc.pop(key, None)
+        if doc is None:
+            return False
+        for term in self._doc_terms[doc]:
+            self._df[term] -= 1
+        self._total_length -= self._doc_lengths[doc]
+        self._doc_keys[doc] = None
+        self._doc_terms[doc] = ()
+        self._deleted += 1
+        return True
+
+    def _compact(self):
+        """Renumber live documents and rewrite postings without tombstones"""
+        remap = {}
+        doc_keys, doc_meeting, doc_lengths, doc_terms = [], [], array("I"), []
+        for doc, key in enumerate(self._doc_keys):
+            if key is None:
+                continue
+            remap[doc] = len(doc_keys)
+            doc_keys.append(key)
+            doc_meeting.append(self._doc_meeting[doc])
+            doc_lengths.append(self._doc_lengths[doc])
+            doc_terms.append(self._doc_terms[doc])
+
+        postings, last_doc = {}, {}
+        for term, buf in self._postings.items():
+            if self._df[term] <= 0:
+                continue
+            new_buf, previous = bytearray(), 0
+            for doc, tf in _decode_postings(buf):
+                if doc in remap:
+                    _encode_varint(remap[doc] - previous, new_buf)
+                    _encode_varint(tf, new_buf)
+                    previous = remap[doc]
+            postings[term] = new_buf
+            last_doc[term] = previous
+
+        self._postings, self._last_doc = postings, last_doc
+        self._df = Counter({term: self._df[term] for term in postings})
+        self._doc_keys, self._doc_meeting = doc_keys, doc_meeting
+        self._doc_lengths, self._doc_terms = doc_lengths, doc_terms
+        self._key_to_doc = {key: doc for doc, key in enumerate(doc_keys)}
+        self._deleted = 0
+        self._vocab_dirty = True
+
+    # --- Queries ---
+
+    def _expand_prefix(self, prefix):
+        if self._vocab_dirty:
+            self._vocab = sorted(self._postings)
+            self._vocab_dirty = False
+        start = bisect.bisect_left(self._vocab, prefix)
+        matches = []
+        for term in self._vocab[start:]:
+            if not term.startswith(prefix):
+                break
+            if self._df[term] > 0:
+                matches.append(term)
+        return heapq.nlargest(PREFIX_EXPANSIONS, matches, key=lambda term: self._df[term])
+
+    def search(self, query, limit: int = 50, prefix: bool = True):
+        """Return up to `limit` (meeting_id, score) pairs, best first"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            live_docs = len(self._key_to_doc)
+            if not live_docs:
+                return []
+            avg_length = self._total_length / live_docs
+
+            # Treat the last term as a prefix unless the user finished typing it
+            query_terms = [[term] for term in terms]
+            if prefix and not query[-1:].isspace():
+                query_terms[-1] = self._expand_prefix(terms[-1]) or [terms[-1]]
+
+            scores = defaultdict(float)
+            for alternatives in query_terms:
+                term_scores = defaultdict(float)
+                for term in alternatives:
+                    df = self._df.get(term, 0)
+                    if df <= 0:
+                        continue
+                    idf = math.log(1 + (live_docs - df + 0.5) / (df + 0.5))
+                    for doc, tf in _decode_postings(self._postings[term]):
+                        if self._doc_keys[doc] is None:
+                            continue
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[doc] / avg_length)
+                        term_scores[doc] = max(term_scores[doc], idf * tf * (BM25_K1 + 1) / (tf + norm))
+                for doc, score in term_scores.items():
+                    scores[doc] += score
+
+            # A meeting's score is its best document (the meeting or its transcript)
+            by_meeting = {}
+            for doc, score in scores.items():
+                meeting_id = self._doc_meeting[doc]
+                by_meeting[meeting_id] = max(by_meeting.get(meeting_id, 0.0), score)
+
+        return heapq.nlargest(limit, by_meeting.items(), key=lambda item: item[1])
+
+    def stats(self):
+        with self._lock:
+            return {
+                "documents": len(self._key_to_doc),
+                "terms": sum(1 for df in self._df.values() if df > 0),
+                "postings_bytes": sum(len(buf) for buf in self._postings.values()),
+                "tombstones": self._deleted,
+            }
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_vocab"], state["_vocab_dirty"] = [], True
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+
+# --- Process-wide index ---
+
+_index = None
+_index_lock = threading.Lock()
+# mtime of the index file this process last loaded or wrote; another
+# process replacing the file (e.g. process_backlog.py --rebuild-indexes)
+# changes it, and then the file wins over the in-memory copy
+_index_mtime = None
+
+
+def get_index():
+    """Return the shared index, loading it from disk on first use or after another process replaced it.
+
+    Without an index file a full build starts in the background (see
+    rebuild_index) and the incomplete in-memory index is served until it
+    finishes; a failed build is retried after SEARCH_INDEX_BUILD_RETRY.
+    """
+    global _index, _index_mtime
+    if _index is not None and _index_mtime is not None and file_mtime(SEARCH_INDEX_PATH) == _index_mtime:
+        return _index
+    with _index_lock:
+        mtime = file_mtime(SEARCH_INDEX_PATH)
+        if mtime is None:
+            if _index is None:
+                _index = InvertedIndex()
+            _initial_build.start()
+            return _index
+        if _index is not None and mtime == _index_mtime:
+            return _index
+        if _index is not None:
+            print("Search index file was replaced on disk, reloading it")
+        _index, _index_mtime = _load_index(), mtime
+        return _index
+
+
+def _load_index():
+    try:
+        with open(SEARCH_INDEX_PATH, "rb") as f:
+            return pickle.load(f)
+    except Exception as e:
+        print(f"Error loading search index, starting empty: {e}")
+        return InvertedIndex()
+
+
+def _write_index_file(index):
+    tmp_path = f"{SEARCH_INDEX_PATH}.tmp"
+    with index._lock:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, SEARCH_INDEX_PATH)
+
+
+def save_index(force: bool = False):
+    """Write the index to disk atomically.
+
+    Unless `force` is set, a file replaced by another process since this
+    one loaded it is kept, and the stale in-memory copy is dropped.
+    """
+    global _index, _index_mtime
+    with _index_lock:
+        if _index is None:
+            return
+        if not force and _index_mtime is None:
+            # Not built yet; the initial build writes the first file
+            return
+        if not force and file_mtime(SEARCH_INDEX_PATH) != _index_mtime:
+            print("Search index file was replaced on disk, keeping it instead of saving")
+            _index = None
+            return
+        _write_index_file(_index)
+        _index_mtime = file_mtime(SEARCH_INDEX_PATH)
+
+
+# Batches bursts of writes into one save
+_saver = DebouncedSave(save_index, SEARCH_INDEX_SAVE_DELAY)
+
+
+def _meeting_text(meeting):
+    title = meeting.get("title") or ""
+    parts = [title] * TITLE_BOOST + [
+        meeting.get("summary") or "",
+        " ".join(meeting.get("key_points") or []),
+        " ".join(meeting.get("followup_points") or []),
+    ]
+    return " ".join(parts)
+
+
+def index_meetings(meetings):
+    """Add or refresh meeting documents"""
+    index = get_index()
+    for meeting in meetings:
+        index.add(f"meeting:{meeting['id']}", str(meeting["id"]), _meeting_text(meeting))
+    _saver.schedule()
+
+
+def index_transcripts(transcripts_by_meeting):
+    """Add or refresh transcript documents, keyed by the meeting they belong to"""
+    index = get_index()
+    for meeting_id, transcript in transcripts_by_meeting.items():
+        index.add(f"transcript:{transcript['id']}", str(meeting_id), transcript.get("transcript_text") or "")
+    _saver.schedule()
+
+
+def remove_meetings(meeting_ids):
+    index = get_index()
+    for meeting_id in meeting_ids:
+        index.remove(f"meeting:{meeting_id}")
+    _saver.schedule()
+
+
+def remove_transcripts(transcript_ids):
+    index = get_index()
+    for transcript_id in transcript_ids:
+        index.remove(f"transcript:{transcript_id}")
+    _saver.schedule()
+
+
+def search_meetings(query, limit: int = 50):
+    """Rank meetings for a query; returns (meeting_id, score) pairs"""
+    return get_index().search(query, limit)
+
+
+def _build_index(page_size: int = 200):
+    """Index every meeting and transcript; raises if any page fails"""
+    from supabase_client import fetch_transcripts_by_ids, iter_meeting_pages
+
+    index = InvertedIndex()
+    # Uncached pages: a full scan would only flush the query cache
+    for meetings in iter_meeting_pages(
+        page_size, columns="id, created_at, title, summary, key_points, followup_points, transcript_id"
+    ):
+        for meeting in meetings:
+            index.add(f"meeting:{meeting['id']}", str(meeting["id"]), _meeting_text(meeting))
+
+        meeting_by_transcript = {str(m["transcript_id"]): m["id"] for m in meetings if m.get("transcript_id")}
+        for transcript in fetch_transcripts_by_ids(list(meeting_by_transcript)).unwrap():
+            meeting_id = meeting_by_transcript[str(transcript["id"])]
+            index.add(f"transcript:{transcript['id']}", str(meeting_id), transcript.get("transcript_text") or "")
+    return index
+
+
+def rebuild_index(page_size: int = 200):
+    """Rebuild the index from scratch by paging through all meetings"""
+    global _index
+    # Raises on a failed page so a partial rebuild never replaces the index
+    index = _build_index(page_size)
+    with _index_lock:
+        _index = index
+    save_index(force=True)
+    return index.stats()
+
+
+_initial_build = BackgroundBuild(rebuild_index, "search index build", SEARCH_INDEX_BUILD_RETRY)
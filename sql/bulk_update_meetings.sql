@@ -0,0 +1,29 @@
+-- bulk_update_meetings.sql
+-- Batched UPDATE for the transcript worker; the app calls it as rpc("bulk_update_meetings").
+-- Run once in the Supabase SQL editor.
+--
+-- Unlike an upsert, rows that no longer exist (deleted, archived or purged by
+-- retention after their job was claimed) are skipped instead of re-inserted.
+-- Columns missing from an update, or null in it, keep their current value.
+-- Updates use the meetings column names, e.g. [{"id": ..., "summary": ...}].
+
+create or replace function public.bulk_update_meetings(updates jsonb)
+returns setof public.meetings
+language sql
+volatile
+set search_path = public
+as $$
+  update public.meetings as m
+  set
+    title = coalesce(u.title, m.title),
+    summary = coalesce(u.summary, m.summary),
+    key_points = coalesce(u.key_points, m.key_points),
+    followup_points = coalesce(u.followup_points, m.followup_points),
+    next_meet_schedule = coalesce(u.next_meet_schedule, m.next_meet_schedule)
+  from jsonb_populate_recordset(null::public.meetings, updates) as u
+  where m.id = u.id
+  returning m.*;
+$$;
+
+-- Security invoker: row-level security applies exactly as for a direct UPDATE
+grant execute on function public.bulk_update_meetings(jsonb) to anon, authenticated;
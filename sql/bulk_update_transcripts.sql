@@ -0,0 +1,26 @@
+-- bulk_update_transcripts.sql
+-- Batched UPDATE for the codec migration; the app calls it as rpc("bulk_update_transcripts").
+-- Run once in the Supabase SQL editor, next to bulk_update_meetings.sql.
+--
+-- Rows that no longer exist are skipped, and a null transcript_text keeps
+-- the current value. Updates look like [{"id": ..., "transcript_text": ...}].
+-- Returns the number of rows updated rather than the (large) rows themselves.
+
+create or replace function public.bulk_update_transcripts(updates jsonb)
+returns integer
+language sql
+volatile
+set search_path = public
+as $$
+  with updated as (
+    update public.transcripts as t
+    set transcript_text = coalesce(u.transcript_text, t.transcript_text)
+    from jsonb_populate_recordset(null::public.transcripts, updates) as u
+    where t.id = u.id
+    returning 1
+  )
+  select count(*)::integer from updated;
+$$;
+
+-- Security invoker: row-level security applies exactly as for a direct UPDATE
+grant execute on function public.bulk_update_transcripts(jsonb) to anon, authenticated;
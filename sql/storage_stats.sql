@@ -0,0 +1,51 @@
+-- storage_stats.sql
+-- Real storage accounting for the Space Management tab.
+-- Run once in the Supabase SQL editor; the app calls it as rpc("storage_stats")
+-- and reports an error on the Space Management tab until it is installed.
+--
+-- The function runs as its owner to read the catalog sizes, so it is not
+-- callable by the anon role: the app's SUPABASE_KEY must belong to an
+-- authenticated user or the service role.
+--
+-- Table sizes include TOAST and indexes. Column sizes use pg_column_size,
+-- i.e. the bytes actually stored after Postgres' own compression.
+
+create or replace function public.storage_stats()
+returns json
+language sql
+stable
+security definer
+set search_path = public
+as $$
+  select json_build_object(
+    'tables', json_build_object(
+      'meetings', json_build_object(
+        'total_bytes', pg_total_relation_size('public.meetings'),
+        'table_bytes', pg_table_size('public.meetings'),
+        'index_bytes', pg_indexes_size('public.meetings')
+      ),
+      'transcripts', json_build_object(
+        'total_bytes', pg_total_relation_size('public.transcripts'),
+        'table_bytes', pg_table_size('public.transcripts'),
+        'index_bytes', pg_indexes_size('public.transcripts')
+      )
+    ),
+    'columns', (
+      select json_build_object(
+        'meetings.title', coalesce(sum(pg_column_size(title)), 0),
+        'meetings.summary', coalesce(sum(pg_column_size(summary)), 0),
+        'meetings.key_points', coalesce(sum(pg_column_size(key_points)), 0),
+        'meetings.followup_points', coalesce(sum(pg_column_size(followup_points)), 0)
+      )
+      from public.meetings
+    )::jsonb || (
+      select json_build_object(
+        'transcripts.transcript_text', coalesce(sum(pg_column_size(transcript_text)), 0)
+      )
+      from public.transcripts
+    )::jsonb
+  );
+$$;
+
+revoke all on function public.storage_stats() from public, anon;
+grant execute on function public.storage_stats() to authenticated, service_role;
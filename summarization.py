@@ -0,0 +1,142 @@
+# summarization.py
+"""Summarize transcripts of any length with the shared model.
+
+BART only sees ~1024 tokens, so long transcripts are split into
+overlapping token windows, the windows are summarized in batches (map),
+and the joined chunk summaries are summarized again (reduce).
+
+Many transcripts can be summarized together: their chunks share one pool
+that is sorted by token length before batching, so each batch pads to a
+similar length instead of to the longest transcript in the backlog.
+"""
+import os
+import time
+
+from model_registry import get_summarizer, summarize
+
+# --- Configuration from environment variables ---
+SUMMARY_CHUNK_TOKENS = int(os.environ.get("SUMMARY_CHUNK_TOKENS", "900"))
+SUMMARY_CHUNK_OVERLAP = int(os.environ.get("SUMMARY_CHUNK_OVERLAP", "100"))
+SUMMARY_BATCH_SIZE = int(os.environ.get("SUMMARY_BATCH_SIZE", "4"))
+SUMMARY_MAX_REDUCE_ROUNDS = int(os.environ.get("SUMMARY_MAX_REDUCE_ROUNDS", "3"))
+
+GENERATE_KWARGS = {"max_length": 150, "min_length": 50, "do_sample": False}
+
+
+def summary_params():
+    """Settings that change summary output, used to key cached results"""
+    return {
+        **GENERATE_KWARGS,
+        "chunk_tokens": SUMMARY_CHUNK_TOKENS,
+        "chunk_overlap": SUMMARY_CHUNK_OVERLAP,
+        "max_reduce_rounds": SUMMARY_MAX_REDUCE_ROUNDS,
+    }
+
+
+def _token_windows(text, tokenizer, chunk_tokens, overlap):
+    """Return (chunk_text, token_count) windows covering the text"""
+    if overlap >= chunk_tokens:
+        raise ValueError("Chunk overlap must be smaller than the chunk size")
+
+    token_ids = tokenizer.encode(text, add_special_tokens=False)
+    if len(token_ids) <= chunk_tokens:
+        return [(text, len(token_ids))]
+
+    windows = []
+    step = chunk_tokens - overlap
+    for start in range(0, len(token_ids), step):
+        window = token_ids[start:start + chunk_tokens]
+        windows.append((tokenizer.decode(window, skip_special_tokens=True).strip(), len(window)))
+        if start + chunk_tokens >= len(token_ids):
+            break
+    return windows
+
+
+def chunk_text(text, tokenizer, chunk_tokens: int = SUMMARY_CHUNK_TOKENS, overlap: int = SUMMARY_CHUNK_OVERLAP):
+    """Split text into overlapping windows of at most `chunk_tokens` tokens"""
+    return [chunk for chunk, _ in _token_windows(text, tokenizer, chunk_tokens, overlap)]
+
+
+def _pool(windows):
+    """Flatten per-text windows into ((text_id, index), chunk, token_count) items"""
+    return [
+        ((text_id, index), chunk, n_tokens)
+        for text_id, text_windows in windows.items()
+        for index, (chunk, n_tokens) in enumerate(text_windows)
+    ]
+
+
+def _summarize_pool(pool, batch_size, generate_kwargs):
+    """Summarize (key, text, token_count) items in length-sorted batches"""
+    ordered = sorted(pool, key=lambda item: item[2])
+    summaries = {}
+    for start in range(0, len(ordered), batch_size):
+        batch = ordered[start:start + batch_size]
+        results = summarize([text for _, text, _ in batch], batch_size=len(batch), truncation=True, **generate_kwargs)
+        if results is None:
+            raise RuntimeError("Summarization model is not available")
+        for (key, _, _), result in zip(batch, results):
+            summaries[key] = result['summary_text']
+    return summaries
+
+
+def summarize_batch(texts, chunk_tokens: int = SUMMARY_CHUNK_TOKENS, overlap: int = SUMMARY_CHUNK_OVERLAP,
+                    batch_size: int = SUMMARY_BATCH_SIZE, **generate_kwargs):
+    """Summarize many texts at once.
+
+    `texts` maps an id (e.g. a meeting id) to its text. Returns
+    (summaries, timings) where summaries maps the same ids to summary
+    text and timings holds seconds spent per stage plus chunk counts.
+    """
+    generate_kwargs = {**GENERATE_KWARGS, **generate_kwargs}
+    summarizer = get_summarizer()
+    if summarizer is None:
+        raise RuntimeError("Summarization model is not available")
+    tokenizer = summarizer.tokenizer
+
+    timings = {"chunk": 0.0, "map": 0.0, "reduce": 0.0, "texts": len(texts), "chunks": 0, "reduce_rounds": 0}
+    started = time.perf_counter()
+
+    # Map: summarize every window of every text in one shared pool
+    stage_start = time.perf_counter()
+    windows = {text_id: _token_windows(text, tokenizer, chunk_tokens, overlap) for text_id, text in texts.items()}
+    timings["chunk"] = time.perf_counter() - stage_start
+    timings["chunks"] = sum(len(w) for w in windows.values())
+
+    stage_start = time.perf_counter()
+    chunk_summaries = _summarize_pool(_pool(windows), batch_size, generate_kwargs)
+    partials = {
+        text_id: [chunk_summaries[(text_id, index)] for index in range(len(text_windows))]
+        for text_id, text_windows in windows.items()
+    }
+    timings["map"] = time.perf_counter() - stage_start
+
+    # Reduce: keep summarizing joined summaries until each fits one window
+    stage_start = time.perf_counter()
+    while timings["reduce_rounds"] < SUMMARY_MAX_REDUCE_ROUNDS:
+        pending = {text_id: parts for text_id, parts in partials.items() if len(parts) > 1}
+        if not pending:
+            break
+        timings["reduce_rounds"] += 1
+
+        windows = {text_id: _token_windows(" ".join(parts), tokenizer, chunk_tokens, overlap)
+                   for text_id, parts in pending.items()}
+        chunk_summaries = _summarize_pool(_pool(windows), batch_size, generate_kwargs)
+        for text_id, text_windows in windows.items():
+            partials[text_id] = [chunk_summaries[(text_id, index)] for index in range(len(text_windows))]
+    timings["reduce"] = time.perf_counter() - stage_start
+
+    timings["total"] = time.perf_counter() - started
+    summaries = {text_id: " ".join(parts) for text_id, parts in partials.items()}
+    return summaries, timings
+
+
+def summarize_long_text(text, chunk_tokens: int = SUMMARY_CHUNK_TOKENS, overlap: int = SUMMARY_CHUNK_OVERLAP,
+                        batch_size: int = SUMMARY_BATCH_SIZE, **generate_kwargs):
+    """Map-reduce summarize text that may exceed the model's context window.
+
+    Returns (summary, timings) where timings holds seconds spent per stage
+    plus the number of chunks and reduce rounds.
+    """
+    summaries, timings = summarize_batch({0: text}, chunk_tokens, overlap, batch_size, **generate_kwargs)
+    return summaries[0], timings
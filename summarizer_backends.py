@@ -0,0 +1,258 @@
+# summarizer_backends.py
+"""Interchangeable summarization backends for CPU-only hosts.
+
+The active backend is chosen with the SUMMARIZER_BACKEND environment
+variable. Run this module directly to compare backends on a sample
+corpus:
+
+    python summarizer_backends.py samples/ --backends bart distilbart bart-int8
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import re
+import sys
+import time
+from collections import Counter
+
+from transformers import pipeline
+
+DEFAULT_BACKEND = "bart"
+
+# Upper bound for one backend's run over the whole corpus in the benchmark
+BENCHMARK_TIMEOUT = float(os.environ.get("BENCHMARK_TIMEOUT", "3600"))
+
+
+class SummarizerBackend:
+    """A summarization pipeline built from a Hugging Face checkpoint"""
+
+    def __init__(self, name: str, model_id: str, quantize: bool = False):
+        self.name = name
+        self.model_id = model_id
+        self.quantize = quantize
+
+    @property
+    def version(self):
+        """Identifier that changes whenever the backend's output can change"""
+        return f"{self.model_id}+int8" if self.quantize else self.model_id
+
+    def load(self):
+        summarizer = pipeline("summarization", model=self.model_id, device=-1)
+        if self.quantize:
+            import torch
+
+            # Dynamic int8 quantization of the Linear layers; activations stay fp32
+            summarizer.model = torch.quantization.quantize_dynamic(
+                summarizer.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        summarizer.model.eval()
+        return summarizer
+
+
+BACKENDS = {
+    "bart": SummarizerBackend("bart", "facebook/bart-large-cnn"),
+    "distilbart": SummarizerBackend("distilbart", "sshleifer/distilbart-cnn-12-6"),
+    "bart-int8": SummarizerBackend("bart-int8", "facebook/bart-large-cnn", quantize=True),
+    "distilbart-int8": SummarizerBackend("distilbart-int8", "sshleifer/distilbart-cnn-12-6", quantize=True),
+}
+
+
+def get_backend(name: str):
+    """Look up a backend by name"""
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown summarizer backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+
+
+# --- ROUGE scoring ---
+
+def _rouge_tokens(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def _f1(overlap, candidate_total, reference_total):
+    if not overlap or not candidate_total or not reference_total:
+        return 0.0
+    precision = overlap / candidate_total
+    recall = overlap / reference_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def _lcs_length(a, b):
+    previous = [0] * (len(b) + 1)
+    for token_a in a:
+        current = [0]
+        for j, token_b in enumerate(b, 1):
+            current.append(previous[j - 1] + 1 if token_a == token_b else max(previous[j], current[j - 1]))
+        previous = current
+    return previous[-1]
+
+
+def rouge_scores(candidate: str, reference: str):
+    """ROUGE-1, ROUGE-2 and ROUGE-L F1 of a candidate against a reference"""
+    cand, ref = _rouge_tokens(candidate), _rouge_tokens(reference)
+    scores = {}
+    for n in (1, 2):
+        cand_ngrams = Counter(zip(*[cand[i:] for i in range(n)]))
+        ref_ngrams = Counter(zip(*[ref[i:] for i in range(n)]))
+        overlap = sum((cand_ngrams & ref_ngrams).values())
+        scores[f"rouge{n}"] = _f1(overlap, sum(cand_ngrams.values()), sum(ref_ngrams.values()))
+    scores["rougeL"] = _f1(_lcs_length(cand, ref), len(cand), len(ref))
+    return scores
+
+
+# --- Backend comparison ---
+
+def load_corpus(path: str, limit: int = None):
+    """Load sample transcripts from a directory of .txt files or a .jsonl file"""
+    texts = []
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".txt"):
+                with open(os.path.join(path, name), encoding="utf-8") as f:
+                    texts.append(f.read())
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    texts.append(json.loads(line)["transcript_text"])
+    return texts[:limit] if limit else texts
+
+
+def _peak_rss_mb():
+    import resource  # POSIX only
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_backend(name, corpus, results):
+    # Runs in a fresh process so peak RSS belongs to this backend alone;
+    # failures are sent back instead of leaving the parent waiting
+    try:
+        results.put(_benchmark_backend(name, corpus))
+    except BaseException as e:
+        results.put({"backend": name, "error": f"{type(e).__name__}: {e}"})
+        raise
+
+
+def _benchmark_backend(name, corpus):
+    os.environ["SUMMARIZER_BACKEND"] = name
+    from model_registry import get_summarizer
+    from summarization import summarize_long_text
+
+    load_start = time.perf_counter()
+    get_summarizer()
+    load_seconds = time.perf_counter() - load_start
+
+    summaries, latencies = [], []
+    for text in corpus:
+        start = time.perf_counter()
+        summary, _ = summarize_long_text(text)
+        latencies.append(time.perf_counter() - start)
+        summaries.append(summary)
+
+    return {
+        "backend": name,
+        "load_seconds": load_seconds,
+        "latencies": latencies,
+        "summaries": summaries,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _collect_run(name, process, results, timeout):
+    """Wait for a backend process's result, failing instead of hanging if it died"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            run = results.get(timeout=1.0)
+            break
+        except queue.Empty:
+            if not process.is_alive():
+                # It may have put its result just before exiting
+                try:
+                    run = results.get(timeout=1.0)
+                    break
+                except queue.Empty:
+                    raise RuntimeError(f"Backend {name!r} exited with code {process.exitcode} without a result")
+            if time.monotonic() > deadline:
+                process.terminate()
+                process.join()
+                raise RuntimeError(f"Backend {name!r} did not finish within {timeout:.0f}s")
+    process.join()
+    if "error" in run:
+        raise RuntimeError(f"Backend {name!r} failed: {run['error']}")
+    return run
+
+
+def compare_backends(corpus, backend_names=None, reference: str = DEFAULT_BACKEND,
+                     timeout: float = BENCHMARK_TIMEOUT):
+    """Benchmark backends on a corpus and score them against the reference backend.
+
+    Each backend runs in its own process. Returns one report dict per
+    backend with load time, mean/p95 latency, peak RSS and mean ROUGE F1.
+    Raises RuntimeError if a backend fails, crashes or exceeds `timeout`
+    seconds.
+    """
+    backend_names = list(backend_names or BACKENDS)
+    for name in backend_names:
+        get_backend(name)
+    if reference not in backend_names:
+        backend_names.insert(0, reference)
+
+    context = multiprocessing.get_context("spawn")
+    runs = {}
+    for name in backend_names:
+        results = context.Queue()
+        process = context.Process(target=_run_backend, args=(name, corpus, results))
+        process.start()
+        runs[name] = _collect_run(name, process, results, timeout)
+
+    reference_summaries = runs[reference]["summaries"]
+    reports = []
+    for name in backend_names:
+        run = runs[name]
+        latencies = sorted(run["latencies"])
+        scores = [rouge_scores(s, r) for s, r in zip(run["summaries"], reference_summaries)]
+        report = {
+            "backend": name,
+            "model": get_backend(name).version,
+            "load_seconds": run["load_seconds"],
+            "mean_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p95_latency": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] if latencies else 0.0,
+            "peak_rss_mb": run["peak_rss_mb"],
+        }
+        for metric in ("rouge1", "rouge2", "rougeL"):
+            report[metric] = sum(s[metric] for s in scores) / len(scores) if scores else 0.0
+        reports.append(report)
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare summarizer backends on a sample corpus")
+    parser.add_argument("corpus", help="Directory of .txt transcripts or a .jsonl file with transcript_text")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--reference", default=DEFAULT_BACKEND, choices=list(BACKENDS))
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N transcripts")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.limit)
+    if not corpus:
+        parser.error("No transcripts found in corpus")
+
+    reports = compare_backends(corpus, args.backends, args.reference)
+    print(f"{'backend':<16}{'load s':>8}{'mean s':>8}{'p95 s':>8}{'RSS MB':>9}{'R-1':>7}{'R-2':>7}{'R-L':>7}")
+    for r in reports:
+        print(
+            f"{r['backend']:<16}{r['load_seconds']:>8.1f}{r['mean_latency']:>8.2f}{r['p95_latency']:>8.2f}"
+            f"{r['peak_rss_mb']:>9.0f}{r['rouge1']:>7.3f}{r['rouge2']:>7.3f}{r['rougeL']:>7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# summary_cache.py
+"""Content-addressed on-disk cache for processed transcripts.
+
+Entries are keyed by a hash of the transcript text, the model version and
+the generation parameters, so reprocessing the same transcript with the
+same model never reruns inference. The cache is bounded by entry count
+and total bytes and evicts the least recently used entries first.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from local_store import connect_sqlite
+
+SUMMARY_CACHE_PATH = os.environ.get("SUMMARY_CACHE_PATH", "summary_cache.db")
+SUMMARY_CACHE_MAX_ENTRIES = int(os.environ.get("SUMMARY_CACHE_MAX_ENTRIES", "10000"))
+SUMMARY_CACHE_MAX_BYTES = int(os.environ.get("SUMMARY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_stats_lock = threading.Lock()
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS summary_cache (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        last_access REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_summary_cache_access ON summary_cache(last_access)",
+)
+
+
+def _connect():
+    return connect_sqlite(SUMMARY_CACHE_PATH, _SCHEMA)
+
+
+def _count(stat: str, n: int = 1):
+    with _stats_lock:
+        _stats[stat] += n
+
+
+def cache_key(transcript_text: str, model_version: str, params: dict):
+    """Hash transcript text together with everything that shapes the output"""
+    digest = hashlib.sha256()
+    digest.update(model_version.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(transcript_text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def get_cached(key: str):
+    """Return the cached entry for key, or None on a miss"""
+    try:
+        with _connect() as conn:
+            row = conn.execute("SELECT value FROM summary_cache WHERE key = ?", (key,)).fetchone()
+            if row:
+                conn.execute("UPDATE summary_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+    except sqlite3.Error as e:
+        print(f"Error reading summary cache: {e}")
+        row = None
+
+    if row is None:
+        _count("misses")
+        return None
+    _count("hits")
+    return json.loads(row[0])
+
+
+def put_cached(key: str, summary: str, key_points: list, followup_points: list):
+    """Store a processed transcript and evict old entries beyond the bounds"""
+    value = json.dumps({
+        "summary": summary,
+        "key_points": key_points,
+        "followup_points": followup_points,
+    })
+    try:
+        with _connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summary_cache (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), time.time())
+            )
+            _evict(conn)
+    except sqlite3.Error as e:
+        print(f"Error writing summary cache: {e}")
+
+
+def _evict(conn):
+    entries, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summary_cache").fetchone()
+    if entries <= SUMMARY_CACHE_MAX_ENTRIES and total_bytes <= SUMMARY_CACHE_MAX_BYTES:
+        return
+
+    evicted = 0
+    for key, size in conn.execute("SELECT key, size FROM summary_cache ORDER BY last_access").fetchall():
+        if entries <= SUMMARY_CACHE_MAX_ENTRIES and total_bytes <= SUMMARY_CACHE_MAX_BYTES:
+            break
+        conn.execute("DELETE FROM summary_cache WHERE key = ?", (key,))
+        entries -= 1
+        total_bytes -= size
+        evicted += 1
+    _count("evictions", evicted)
+
+
+def clear_cache():
+    """Remove every cached entry"""
+    with _connect() as conn:
+        conn.execute("DELETE FROM summary_cache")
+
+
+def get_cache_stats():
+    """Return hit/miss/eviction counters plus the cache's current size"""
+    with _stats_lock:
+        stats = dict(_stats)
+    try:
+        with _connect() as conn:
+            entries, total_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summary_cache"
+            ).fetchone()
+    except sqlite3.Error as e:
+        print(f"Error reading summary cache: {e}")
+        entries, total_bytes = 0, 0
+
+    lookups = stats["hits"] + stats["misses"]
+    stats.update({
+        "entries": entries,
+        "size_bytes": total_bytes,
+        "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+    })
+    return stats
@@ -1,15 +1,164 @@
 # supabase_client.py
 from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
+from postgrest import ReturnMethod
+from query_cache import QueryCache
+from resilience import CircuitBreaker, QueryResult, call_with_retry
+from text_codec import decode_text, encode_text
+import search_index
+import vector_index
 import os
+import threading
+import httpx
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
-import io
-import csv
 
 # --- Supabase credentials from environment variables ---
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# --- Meeting list page size ---
+MEETINGS_PAGE_SIZE = int(os.environ.get("MEETINGS_PAGE_SIZE", "50"))
+
+# --- Columns needed to render a meeting card (first key points only) ---
+MEETING_CARD_COLUMNS = "id, title, transcript_id, created_at, updated_at, " \
+    "key_point_1:key_points->>0, key_point_2:key_points->>1, key_point_3:key_points->>2"
+KEY_POINT_PREVIEW_CHARS = 50
+
+# --- Shared read-through cache for meeting queries ---
+QUERY_CACHE_TTL = float(os.environ.get("QUERY_CACHE_TTL", "30"))
+QUERY_CACHE_MAX_ENTRIES = int(os.environ.get("QUERY_CACHE_MAX_ENTRIES", "256"))
+
+# --- Storage accounting (see sql/storage_stats.sql) ---
+STORAGE_QUOTA_MB = float(os.environ.get("STORAGE_QUOTA_MB", "1024"))
+STORAGE_STATS_REFRESH = float(os.environ.get("STORAGE_STATS_REFRESH", "600"))
+
+# --- Compression at rest (see text_codec.py) ---
+# Column -> length from which values are stored compressed. Only long
+# summaries qualify, since compressed text no longer matches the ilike search.
+SUMMARY_CODEC_MIN_CHARS = int(os.environ.get("SUMMARY_CODEC_MIN_CHARS", "2000"))
+TRANSCRIPT_CODEC_MIN_CHARS = int(os.environ.get("TRANSCRIPT_CODEC_MIN_CHARS", "512"))
+CODEC_COLUMNS = {
+    "meetings": {"summary": SUMMARY_CODEC_MIN_CHARS},
+    "transcripts": {"transcript_text": TRANSCRIPT_CODEC_MIN_CHARS},
+}
+
+# --- Local search indexes ---
+# Off for headless worker processes, which would otherwise overwrite each other's index files
+LOCAL_INDEXES_ENABLED = os.environ.get("LOCAL_INDEXES_ENABLED", "1") == "1"
+
+# --- Thread pool for issuing independent queries concurrently ---
+QUERY_WORKERS = int(os.environ.get("QUERY_WORKERS", "8"))
+QUERY_GATHER_DEPTH = 3  # tab -> database stats -> storage stats
+
+# --- Transport: connection pool, timeouts, retries and circuit breaker ---
+SUPABASE_CONNECT_TIMEOUT = float(os.environ.get("SUPABASE_CONNECT_TIMEOUT", "5"))
+SUPABASE_READ_TIMEOUT = float(os.environ.get("SUPABASE_READ_TIMEOUT", "15"))
+SUPABASE_MAX_CONNECTIONS = int(os.environ.get("SUPABASE_MAX_CONNECTIONS", "20"))
+SUPABASE_KEEPALIVE_CONNECTIONS = int(os.environ.get("SUPABASE_KEEPALIVE_CONNECTIONS", "10"))
+SUPABASE_KEEPALIVE_EXPIRY = float(os.environ.get("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+SUPABASE_READ_RETRIES = int(os.environ.get("SUPABASE_READ_RETRIES", "3"))
+SUPABASE_BREAKER_THRESHOLD = int(os.environ.get("SUPABASE_BREAKER_THRESHOLD", "5"))
+SUPABASE_BREAKER_RESET = float(os.environ.get("SUPABASE_BREAKER_RESET", "30"))
+
+def _client_options():
+    timeout = httpx.Timeout(SUPABASE_READ_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT)
+    limits = httpx.Limits(
+        max_connections=SUPABASE_MAX_CONNECTIONS,
+        max_keepalive_connections=SUPABASE_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY,
+    )
+    try:
+        # Newer supabase-py versions accept a preconfigured httpx client
+        return ClientOptions(
+            postgrest_client_timeout=timeout,
+            httpx_client=httpx.Client(timeout=timeout, limits=limits),
+        )
+    except TypeError:
+        return ClientOptions(postgrest_client_timeout=timeout)
+
+supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY, options=_client_options())
+circuit_breaker = CircuitBreaker(SUPABASE_BREAKER_THRESHOLD, SUPABASE_BREAKER_RESET)
+query_cache = QueryCache(ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_MAX_ENTRIES)
+
+_worker_state = threading.local()
+_executors = {}  # nesting level -> pool
+_executors_lock = threading.Lock()
+
+def _mark_query_worker(level):
+    _worker_state.level = level
+
+def _executor_for(level):
+    """Pool for gathers issued at a nesting level, created on first use.
+
+    A nested gather (one issued from a pool thread) uses the next level's
+    pool, so threads only ever wait on a deeper pool and can't starve the
+    pool they run in, while nested fan-outs still run concurrently.
+    """
+    with _executors_lock:
+        executor = _executors.get(level)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=QUERY_WORKERS, thread_name_prefix=f"supabase-query-{level}",
+                initializer=_mark_query_worker, initargs=(level + 1,)
+            )
+            _executors[level] = executor
+        return executor
+
+query_executor = _executor_for(0)
+
+def gather(*calls):
+    """Run zero-argument callables concurrently and return their results in order.
+
+    Independent queries then cost the latency of the slowest one rather
+    than the sum. If any call raises, the first failure (in argument
+    order) is re-raised after all calls have finished. Gathers nested
+    deeper than QUERY_GATHER_DEPTH run inline.
+    """
+    level = getattr(_worker_state, "level", 0)
+    if len(calls) <= 1 or level >= QUERY_GATHER_DEPTH:
+        return [call() for call in calls]
+
+    futures = [_executor_for(level).submit(call) for call in calls]
+    wait(futures)
+    return [future.result() for future in futures]
+
+def _read(query):
+    """Execute an idempotent query, retrying transient failures"""
+    return call_with_retry(query.execute, attempts=SUPABASE_READ_RETRIES, breaker=circuit_breaker)
+
+def _write(query):
+    """Execute a write once; retrying could apply it twice"""
+    return call_with_retry(query.execute, attempts=1, breaker=circuit_breaker)
+
+def _encode_row(table: str, row: dict):
+    """Copy of row with its codec columns compressed for storage"""
+    row = dict(row)
+    for column, min_chars in CODEC_COLUMNS[table].items():
+        if column in row:
+            row[column] = encode_text(row[column], min_chars)
+    return row
+
+def _decode_rows(table: str, rows: list):
+    """Decompress codec columns in place as rows come off the wire; plain values pass through"""
+    columns = CODEC_COLUMNS[table]
+    for row in rows:
+        for column in columns:
+            if column in row:
+                row[column] = decode_text(row[column])
+    return rows
+
+def _cached_result(key, load, tags, what: str):
+    """Read through the query cache, returning a QueryResult instead of raising"""
+    try:
+        return QueryResult(query_cache.get_or_load(key, load, tags=tags))
+    except Exception as e:
+        print(f"Error fetching {what}: {e}")
+        return QueryResult(error=e)
+
+def get_connection_status():
+    """Return the circuit breaker state and consecutive failure count"""
+    return circuit_breaker.stats()
 
 # --- Authentication ---
 def sign_in(email: str, password: str):
@@ -31,11 +180,11 @@ def sign_up(email: str, password: str):
 # --- Fetch meeting transcripts (your existing function) ---
 def fetch_transcripts(user_email: str):
     try:
-        response = supabase.table("meeting_transcripts")\
+        query = supabase.table("meeting_transcripts")\
             .select("*")\
             .eq("user_email", user_email)\
-            .order("start_time", desc=True)\
-            .execute()
+            .order("start_time", desc=True)
+        response = _read(query)
         return response.data
     except Exception as e:
         print(f"Error fetching transcripts: {e}")
@@ -52,7 +201,7 @@ def save_schedule(user_email: str, meeting_title: str, scheduled_time: str, note
         "reminder_sent": False
     }
     try:
-        response = supabase.table("meeting_schedules").insert(data).execute()
+        response = _write(supabase.table("meeting_schedules").insert(data))
         return response.data
     except Exception as e:
         print(f"Error saving schedule: {e}")
@@ -62,13 +211,13 @@ def save_schedule(user_email: str, meeting_title: str, scheduled_time: str, note
 def fetch_upcoming_reminders(user_email: str):
     now = datetime.utcnow().isoformat()
     try:
-        response = supabase.table("meeting_schedules")\
+        query = supabase.table("meeting_schedules")\
             .select("*")\
             .eq("user_email", user_email)\
             .gte("reminder_time", now)\
             .eq("reminder_sent", False)\
-            .order("reminder_time", asc=True)\
-            .execute()
+            .order("reminder_time", asc=True)
+        response = _read(query)
         return response.data
     except Exception as e:
         print(f"Error fetching reminders: {e}")
@@ -77,13 +226,13 @@ def fetch_upcoming_reminders(user_email: str):
 # --- Delete functions (your existing functions) ---
 def delete_transcript(transcript_id: int):
     try:
-        supabase.table("meeting_transcripts").delete().eq("id", transcript_id).execute()
+        _write(supabase.table("meeting_transcripts").delete().eq("id", transcript_id))
     except Exception as e:
         print(f"Error deleting transcript: {e}")
 
 def delete_schedule(schedule_id: int):
     try:
-        supabase.table("meeting_schedules").delete().eq("id", schedule_id).execute()
+        _write(supabase.table("meeting_schedules").delete().eq("id", schedule_id))
     except Exception as e:
         print(f"Error deleting schedule: {e}")
 
@@ -91,29 +240,208 @@ def delete_schedule(schedule_id: int):
 
 # --- Meeting and Transcript Management Functions ---
 
-def fetch_meetings():
-    """Fetch all meetings with their associated transcript info"""
-    try:
-        response = supabase.table("meetings")\
-            .select("*, transcripts(meeting_title, audio_url)")\
-            .order("created_at", desc=True)\
-            .execute()
+def _meeting_tag(meeting_id):
+    return f"meeting:{meeting_id}"
+
+def get_query_cache_stats():
+    """Hit/miss/eviction counters of the shared meeting query cache"""
+    return query_cache.stats()
+
+def _ilike_pattern(text: str):
+    """Quote a search term as a PostgREST substring pattern"""
+    escaped = text.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"*{escaped}*"'
+
+def _apply_meeting_filters(query, search: str = None, start_date=None, end_date=None):
+    """Add search text and created_at date range filters to a meetings query"""
+    if search and search.strip():
+        pattern = _ilike_pattern(search.strip())
+        query = query.or_(f"title.ilike.{pattern},summary.ilike.{pattern}")
+    if start_date:
+        query = query.gte("created_at", str(start_date))
+    if end_date:
+        # Dates are inclusive, so compare against the end of that day
+        query = query.lte("created_at", f"{end_date}T23:59:59.999999")
+    return query
+
+def fetch_meetings(search: str = None, start_date=None, end_date=None):
+    """Fetch all meetings with their associated transcript info (a QueryResult)"""
+    def load():
+        query = supabase.table("meetings")\
+            .select("*, transcripts(meeting_title, audio_url)")
+        query = _apply_meeting_filters(query, search, start_date, end_date)\
+            .order("created_at", desc=True)
+        response = _read(query)
+        return _decode_rows("meetings", response.data or [])
+
+    key = ("fetch_meetings", search, str(start_date), str(end_date))
+    return _cached_result(key, load, ("meetings",), "meetings")
+
+def fetch_meetings_page(page_size: int = MEETINGS_PAGE_SIZE, cursor: tuple = None,
+                        columns: str = "*, transcripts(meeting_title, audio_url)",
+                        search: str = None, start_date=None, end_date=None):
+    """Fetch one page of meetings, newest first, using keyset pagination.
+
+    Rows are ordered on (created_at, id) and `cursor` is the
+    (created_at, id) of the last row of the previous page. Search text
+    and the date range are applied by the database. Returns a
+    QueryResult whose data is (meetings, next_cursor); next_cursor is
+    None on the last page.
+    """
+    def load():
+        return _read_meetings_page(page_size, cursor, columns, search, start_date, end_date)
+
+    key = ("fetch_meetings_page", page_size, cursor, columns, search, str(start_date), str(end_date))
+    return _cached_result(key, load, ("meetings",), "meetings page")
+
+def _read_meetings_page(page_size, cursor, columns, search=None, start_date=None, end_date=None):
+    """Run one keyset page query; returns (meetings, next_cursor) and raises on failure"""
+    query = supabase.table("meetings")\
+        .select(columns)
+    query = _apply_meeting_filters(query, search, start_date, end_date)
+
+    if cursor:
+        created_at, meeting_id = cursor
+        query = query.or_(
+            f'created_at.lt."{created_at}",'
+            f'and(created_at.eq."{created_at}",id.lt."{meeting_id}")'
+        )
+
+    # Ask for one extra row to learn whether another page exists
+    query = query\
+        .order("created_at", desc=True)\
+        .order("id", desc=True)\
+        .limit(page_size + 1)
+    response = _read(query)
+
+    meetings = _decode_rows("meetings", response.data or [])
+    next_cursor = None
+    if len(meetings) > page_size:
+        meetings = meetings[:page_size]
+        next_cursor = (meetings[-1]["created_at"], meetings[-1]["id"])
+    return meetings, next_cursor
+
+def iter_meeting_pages(page_size: int = 500, columns: str = "*", search: str = None,
+                       start_date=None, end_date=None):
+    """Yield successive pages of meetings, newest first, bypassing the query cache.
+
+    For bulk reads such as exports, where caching every page would only
+    hold the whole range in memory. Raises if a page fails.
+    """
+    cursor = None
+    while True:
+        meetings, cursor = _read_meetings_page(page_size, cursor, columns, search, start_date, end_date)
+        if meetings:
+            yield meetings
+        if cursor is None:
+            return
+
+def fetch_meeting_cards_page(page_size: int = MEETINGS_PAGE_SIZE, cursor: tuple = None,
+                             search: str = None, start_date=None, end_date=None):
+    """Fetch one page of slim meeting rows for the card list.
+
+    Only the card fields and the first key points cross the wire. Each
+    row gets a `key_points_preview` list of truncated points and a
+    `has_more_key_points` flag instead of the full key_points column.
+    Returns a QueryResult of (cards, next_cursor).
+    """
+    result = fetch_meetings_page(
+        page_size, cursor, columns=MEETING_CARD_COLUMNS,
+        search=search, start_date=start_date, end_date=end_date
+    )
+    return result.map(lambda page: ([to_meeting_card(meeting) for meeting in page[0]], page[1]))
+
+def to_meeting_card(meeting: dict):
+    """Copy a meeting row, replacing key point columns with a truncated two-point preview"""
+    meeting = dict(meeting)
+    if "key_points" in meeting:
+        key_points = meeting.pop("key_points") or []
+        preview, has_more = key_points[:2], len(key_points) > 2
+    else:
+        preview = [meeting.pop("key_point_1", None), meeting.pop("key_point_2", None)]
+        has_more = meeting.pop("key_point_3", None) is not None
+
+    meeting["key_points_preview"] = [
+        point[:KEY_POINT_PREVIEW_CHARS] + "..." if len(point) > KEY_POINT_PREVIEW_CHARS else point
+        for point in preview if point
+    ]
+    meeting["has_more_key_points"] = has_more
+    return meeting
+
+def fetch_meeting_card_rows_by_ids(meeting_ids: list, start_date=None, end_date=None):
+    """Fetch the raw slim rows for the given meetings, in database order.
+
+    Returns a QueryResult whose data is the cached list itself, which
+    must not be modified.
+    """
+    if not meeting_ids:
+        return QueryResult([])
+
+    def load():
+        query = supabase.table("meetings")\
+            .select(MEETING_CARD_COLUMNS)\
+            .in_("id", list(meeting_ids))
+        response = _read(_apply_meeting_filters(query, start_date=start_date, end_date=end_date))
         return response.data
+
+    key = ("fetch_meeting_cards_by_ids", tuple(meeting_ids), str(start_date), str(end_date))
+    return _cached_result(key, load, ("meetings",), "meetings")
+
+def fetch_meeting_cards_by_ids(meeting_ids: list, start_date=None, end_date=None):
+    """Fetch slim card rows for the given meetings, in the order of meeting_ids (a QueryResult)"""
+    def to_cards(rows):
+        by_id = {str(row["id"]): row for row in rows}
+        return [to_meeting_card(by_id[str(meeting_id)]) for meeting_id in meeting_ids if str(meeting_id) in by_id]
+
+    return fetch_meeting_card_rows_by_ids(meeting_ids, start_date, end_date).map(to_cards)
+
+def _update_search_index(update, *args):
+    """Apply a search or vector index update without letting it fail the database write"""
+    if not LOCAL_INDEXES_ENABLED:
+        return
+    try:
+        update(*args)
     except Exception as e:
-        print(f"Error fetching meetings: {e}")
-        return []
+        print(f"Error updating search index: {e}")
+
+def fetch_unprocessed_meetings(limit: int = 500, after: tuple = None):
+    """Fetch meetings that have a transcript but no summary yet (a QueryResult).
+
+    Oldest first, keyset-paged on (created_at, id): pass the last row's
+    (created_at, id) as `after` to get the next page.
+    """
+    def load():
+        query = supabase.table("meetings")\
+            .select("id, created_at, transcript_id, summary")\
+            .not_.is_("transcript_id", "null")\
+            .or_("summary.is.null,summary.eq.")
+        if after:
+            created_at, meeting_id = after
+            query = query.or_(
+                f'created_at.gt."{created_at}",'
+                f'and(created_at.eq."{created_at}",id.gt."{meeting_id}")'
+            )
+        query = query\
+            .order("created_at")\
+            .order("id")\
+            .limit(limit)
+        response = _read(query)
+        return response.data
+
+    key = ("fetch_unprocessed_meetings", limit, tuple(after) if after else None)
+    return _cached_result(key, load, ("meetings",), "unprocessed meetings")
 
 def fetch_meeting_by_id(meeting_id: str):
-    """Fetch a specific meeting by ID"""
-    try:
-        response = supabase.table("meetings")\
+    """Fetch a specific meeting by ID (a QueryResult; data is None if it doesn't exist)"""
+    def load():
+        query = supabase.table("meetings")\
             .select("*")\
-            .eq("id", meeting_id)\
-            .execute()
-        return response.data[0] if response.data else None
-    except Exception as e:
-        print(f"Error fetching meeting: {e}")
-        return None
+            .eq("id", meeting_id)
+        response = _read(query)
+        return _decode_rows("meetings", response.data)[0] if response.data else None
+
+    key = ("fetch_meeting_by_id", str(meeting_id))
+    return _cached_result(key, load, (_meeting_tag(meeting_id),), "meeting")
 
 def create_new_meeting(title: str, summary: str, key_points: list, followup_points: list, next_meet_schedule: str = None, transcript_id: str = None):
     """Create a new meeting record - NEW FUNCTION for manual meeting creation"""
@@ -131,7 +459,11 @@ def create_new_meeting(title: str, summary: str, key_points: list, followup_poin
         if transcript_id:
             new_meeting_data["transcript_id"] = transcript_id
 
-        response = supabase.table("meetings").insert(new_meeting_data).execute()
+        response = _write(supabase.table("meetings").insert(_encode_row("meetings", new_meeting_data)))
+        query_cache.invalidate("meetings", "stats")
+        _decode_rows("meetings", response.data or [])
+        _update_search_index(search_index.index_meetings, response.data or [])
+        _update_search_index(vector_index.queue_meetings, response.data or [])
         return True
     except Exception as e:
         print(f"Error creating meeting: {e}")
@@ -150,129 +482,246 @@ def update_meeting(meeting_id: str, title: str, summary: str, key_points: list,
         if next_meet_schedule:
             update_data["next_meet_schedule"] = next_meet_schedule
 
-        response = supabase.table("meetings")\
-            .update(update_data)\
-            .eq("id", meeting_id)\
-            .execute()
+        query = supabase.table("meetings")\
+            .update(_encode_row("meetings", update_data))\
+            .eq("id", meeting_id)
+        response = _write(query)
+        query_cache.invalidate("meetings", "stats", _meeting_tag(meeting_id))
+        _decode_rows("meetings", response.data or [])
+        _update_search_index(search_index.index_meetings, response.data or [])
+        _update_search_index(vector_index.queue_meetings, response.data or [])
         return True
     except Exception as e:
         print(f"Error updating meeting: {e}")
         return False
 
 def fetch_transcript_by_id(transcript_id: str):
-    """Fetch transcript by ID"""
+    """Fetch transcript by ID (a QueryResult; data is None if it doesn't exist)"""
     try:
-        response = supabase.table("transcripts")\
+        query = supabase.table("transcripts")\
             .select("*")\
-            .eq("id", transcript_id)\
-            .execute()
-        return response.data[0] if response.data else None
+            .eq("id", transcript_id)
+        response = _read(query)
+        return QueryResult(_decode_rows("transcripts", response.data)[0] if response.data else None)
     except Exception as e:
         print(f"Error fetching transcript: {e}")
-        return None
-
-def get_database_stats():
-    """Get database statistics"""
-    try:
-        # Get meetings count
-        meetings_response = supabase.table("meetings").select("id", count="exact").execute()
-        meetings_count = meetings_response.count or 0
-
-        # Get transcripts count  
-        transcripts_response = supabase.table("transcripts").select("id", count="exact").execute()
-        transcripts_count = transcripts_response.count or 0
+        return QueryResult(error=e)
 
-        # Note: Supabase doesn't provide direct table size info via client
-        # These would need to be calculated or estimated based on content
-        # For now, providing basic stats
+def fetch_transcripts_by_ids(transcript_ids: list):
+    """Fetch many transcripts in a single query.
 
-        return {
-            "meetings_count": meetings_count,
-            "transcripts_count": transcripts_count,
-            "meetings_size_mb": meetings_count * 0.01,  # Rough estimate
-            "transcripts_size_mb": transcripts_count * 0.05,  # Rough estimate  
-            "total_size_mb": (meetings_count * 0.01) + (transcripts_count * 0.05)
-        }
+    Returns a QueryResult so a failed fetch isn't taken for missing transcripts.
+    """
+    if not transcript_ids:
+        return QueryResult([])
+    try:
+        query = supabase.table("transcripts")\
+            .select("*")\
+            .in_("id", list(set(transcript_ids)))
+        response = _read(query)
+        return QueryResult(_decode_rows("transcripts", response.data or []))
+    except Exception as e:
+        print(f"Error fetching transcripts: {e}")
+        return QueryResult(error=e)
+
+def bulk_update_meetings(updates: list):
+    """Apply many meeting updates in one batched UPDATE (see sql/bulk_update_meetings.sql).
+
+    Each update is a dict with the meeting "id" plus the columns to change;
+    None values are dropped so they leave the stored value alone. Meetings
+    that no longer exist are skipped rather than re-created. Returns a
+    QueryResult of the set of ids (as str) that were updated.
+    """
+    if not updates:
+        return QueryResult(set())
+    payload = [
+        _encode_row("meetings", {column: value for column, value in update.items() if value is not None})
+        for update in updates
+    ]
+    try:
+        response = _write(supabase.rpc("bulk_update_meetings", {"updates": payload}))
     except Exception as e:
-        print(f"Error getting database stats: {e}")
+        print(f"Error updating meetings: {e}")
+        return QueryResult(error=e)
+
+    rows = _decode_rows("meetings", response.data or [])
+    query_cache.invalidate("meetings", *[_meeting_tag(update["id"]) for update in updates])
+    _update_search_index(search_index.index_meetings, rows)
+    _update_search_index(vector_index.queue_meetings, rows)
+    return QueryResult({str(row["id"]) for row in rows})
+
+def get_storage_stats():
+    """Measure bytes per table and per column, refreshed every STORAGE_STATS_REFRESH seconds.
+
+    Requires the storage_stats() database function (sql/storage_stats.sql),
+    which reports real on-disk sizes including TOAST and indexes and does
+    the aggregation server-side. Returns a QueryResult whose error says so
+    if the function is missing or not callable with the app's key.
+    """
+    def load():
+        try:
+            report = _read(supabase.rpc("storage_stats")).data
+        except Exception as e:
+            raise RuntimeError(
+                "storage_stats() failed; install sql/storage_stats.sql and make sure "
+                f"the app's key may execute it ({e})"
+            ) from e
+
         return {
-            "meetings_count": 0,
-            "transcripts_count": 0,
-            "meetings_size_mb": 0,
-            "transcripts_size_mb": 0,
-            "total_size_mb": 0
+            "tables": {name: sizes["total_bytes"] for name, sizes in report["tables"].items()},
+            "columns": report["columns"],
+            "source": "storage_stats()",
+            "measured_at": datetime.utcnow().isoformat(),
         }
 
-def delete_old_records(cutoff_date: str):
-    """Delete records older than cutoff_date"""
     try:
-        # Delete old meetings
-        meetings_response = supabase.table("meetings")\
-            .delete()\
-            .lt("created_at", cutoff_date)\
-            .execute()
-
-        # Delete old transcripts
-        transcripts_response = supabase.table("transcripts")\
-            .delete()\
-            .lt("transcript_created_at", cutoff_date)\
-            .execute()
-
-        # Return count of deleted records (this is approximate)
-        return len(meetings_response.data or []) + len(transcripts_response.data or [])
-
+        return QueryResult(query_cache.get_or_load(
+            ("get_storage_stats",), load, tags=("storage",), ttl=STORAGE_STATS_REFRESH
+        ))
     except Exception as e:
-        print(f"Error deleting old records: {e}")
-        return 0
+        print(f"Error measuring storage: {e}")
+        return QueryResult(error=e)
 
-def export_meetings_csv(start_date: str, end_date: str):
-    """Export meetings data as CSV for date range"""
-    try:
-        response = supabase.table("meetings")\
-            .select("*, transcripts(meeting_title)")\
-            .gte("created_at", start_date)\
-            .lte("created_at", end_date)\
-            .order("created_at", desc=True)\
-            .execute()
-
-        if not response.data:
-            return None
-
-        # Convert to CSV format
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Write headers
-        headers = ["ID", "Title", "Summary", "Key Points", "Followup Points", 
-                  "Next Meeting", "Created At", "Updated At", "Original Meeting Title", "Source Type"]
-        writer.writerow(headers)
-
-        # Write data
-        for meeting in response.data:
-            key_points_str = "; ".join(meeting.get("key_points") or [])
-            followup_str = "; ".join(meeting.get("followup_points") or [])
-            original_title = ""
-            source_type = "Manual Entry"
-
-            if meeting.get("transcripts"):
-                original_title = meeting["transcripts"].get("meeting_title", "")
-                source_type = "From Transcript"
-
-            writer.writerow([
-                meeting.get("id", ""),
-                meeting.get("title", ""),
-                meeting.get("summary", ""),
-                key_points_str,
-                followup_str,
-                meeting.get("next_meet_schedule", ""),
-                meeting.get("created_at", ""),
-                meeting.get("updated_at", ""),
-                original_title,
-                source_type
-            ])
-
-        return output.getvalue()
+def refresh_storage_stats():
+    """Drop the cached storage measurement so the next read measures again"""
+    query_cache.invalidate("storage", "stats")
 
-    except Exception as e:
-        print(f"Error exporting meetings: {e}")
-        return None
+def get_database_stats():
+    """Get row counts and measured storage per table and column (a QueryResult).
+
+    Fails as a whole if the counts fail, so an outage is never shown (or
+    cached) as an empty database. A failed storage measurement, e.g. when
+    storage_stats() isn't installed or granted, only leaves the size
+    fields None and its message in "storage_error".
+    """
+    def load():
+        # Counts and the storage measurement are independent; fetch them together
+        meetings_response, transcripts_response, storage = gather(
+            lambda: _read(supabase.table("meetings").select("id", count="exact")),
+            lambda: _read(supabase.table("transcripts").select("id", count="exact")),
+            get_storage_stats,
+        )
+        stats = {
+            "meetings_count": meetings_response.count or 0,
+            "transcripts_count": transcripts_response.count or 0,
+            "meetings_size_mb": None,
+            "transcripts_size_mb": None,
+            "total_size_mb": None,
+            "columns": {},
+            "storage_source": None,
+            "measured_at": None,
+            "storage_error": str(storage.error) if storage.failed else None,
+        }
+        if storage.ok:
+            tables = storage.data["tables"]
+            meetings_mb = tables.get("meetings", 0) / (1024 * 1024)
+            transcripts_mb = tables.get("transcripts", 0) / (1024 * 1024)
+            stats.update({
+                "meetings_size_mb": meetings_mb,
+                "transcripts_size_mb": transcripts_mb,
+                "total_size_mb": meetings_mb + transcripts_mb,
+                "columns": storage.data["columns"],
+                "storage_source": storage.data["source"],
+                "measured_at": storage.data["measured_at"],
+            })
+        return stats
+
+    return _cached_result(("get_database_stats",), load, ("stats",), "database stats")
+
+# --- Bulk maintenance (retention, archival) ---
+# These raise on failure so long-running jobs can checkpoint and resume.
+
+RETENTION_DATE_COLUMNS = {"meetings": "created_at", "transcripts": "transcript_created_at"}
+
+def fetch_expired_ids(table: str, cutoff_date: str, after_id=None, limit: int = 500):
+    """Ids of rows created before cutoff_date, in id order, starting after after_id"""
+    query = supabase.table(table)\
+        .select("id")\
+        .lt(RETENTION_DATE_COLUMNS[table], cutoff_date)
+    if after_id is not None:
+        query = query.gt("id", after_id)
+    response = _read(query.order("id").limit(limit))
+    return [row["id"] for row in response.data or []]
+
+def fetch_referenced_transcript_ids(transcript_ids: list, cutoff_date: str = None):
+    """Those transcript_ids still used by a meeting (created on or after cutoff_date, if given), as str"""
+    if not transcript_ids:
+        return set()
+    query = supabase.table("meetings")\
+        .select("transcript_id")\
+        .in_("transcript_id", list(transcript_ids))
+    if cutoff_date:
+        query = query.gte("created_at", cutoff_date)
+    response = _read(query)
+    return {str(row["transcript_id"]) for row in response.data or []}
+
+def fetch_rows_by_ids(table: str, ids: list, columns: str = "*"):
+    """Fetch full rows of a table by id, uncached and in their stored (possibly compressed) form"""
+    if not ids:
+        return []
+    response = _read(supabase.table(table).select(columns).in_("id", list(ids)))
+    return response.data or []
+
+def restore_meeting_rows(meeting: dict, transcript: dict = None):
+    """Write archived rows back, transcript first since the meeting references it"""
+    if transcript:
+        _write(supabase.table("transcripts").upsert(transcript, on_conflict="id"))
+    response = _write(supabase.table("meetings").upsert(meeting, on_conflict="id"))
+    query_cache.invalidate("meetings", "stats", "storage", _meeting_tag(meeting["id"]))
+    _decode_rows("meetings", response.data or [])
+    _update_search_index(search_index.index_meetings, response.data or [])
+    _update_search_index(vector_index.queue_meetings, response.data or [])
+    if transcript:
+        transcript = _decode_rows("transcripts", [dict(transcript)])[0]
+        _update_search_index(search_index.index_transcripts, {meeting["id"]: transcript})
+
+def fetch_codec_column_page(table: str, after_id=None, limit: int = 200):
+    """Ids and stored (possibly compressed) codec column values, in id order after after_id"""
+    query = supabase.table(table)\
+        .select(", ".join(["id"] + list(CODEC_COLUMNS[table])))\
+        .order("id")\
+        .limit(limit)
+    if after_id is not None:
+        query = query.gt("id", after_id)
+    response = _read(query)
+    return response.data or []
+
+# Batched UPDATE functions (see sql/bulk_update_*.sql); columns left out keep their value
+_BULK_UPDATE_FUNCTIONS = {"meetings": "bulk_update_meetings", "transcripts": "bulk_update_transcripts"}
+
+def update_stored_values(table: str, rows: list):
+    """Write already-encoded column values back in a single batched UPDATE"""
+    if not rows:
+        return 0
+    _write(supabase.rpc(_BULK_UPDATE_FUNCTIONS[table], {"updates": rows}))
+    # The stored form changed but the text did not; only cached rows and sizes are stale
+    if table == "meetings":
+        query_cache.invalidate("meetings", *[_meeting_tag(row["id"]) for row in rows])
+    query_cache.invalidate("stats", "storage")
+    return len(rows)
+
+def delete_meetings_by_ids(meeting_ids: list):
+    """Delete meetings by id; returns the exact number of rows deleted"""
+    if not meeting_ids:
+        return 0
+    query = supabase.table("meetings")\
+        .delete(count="exact", returning=ReturnMethod.minimal)\
+        .in_("id", list(meeting_ids))
+    response = _write(query)
+    query_cache.invalidate("meetings", "stats", "storage", *[_meeting_tag(meeting_id) for meeting_id in meeting_ids])
+    _update_search_index(search_index.remove_meetings, meeting_ids)
+    _update_search_index(vector_index.remove_meetings, meeting_ids)
+    return response.count or 0
+
+def delete_transcripts_by_ids(transcript_ids: list):
+    """Delete transcripts by id; returns the exact number of rows deleted"""
+    if not transcript_ids:
+        return 0
+    query = supabase.table("transcripts")\
+        .delete(count="exact", returning=ReturnMethod.minimal)\
+        .in_("id", list(transcript_ids))
+    response = _write(query)
+    # Meeting lists embed transcript titles, so they are stale as well
+    query_cache.invalidate("meetings", "stats", "storage")
+    _update_search_index(search_index.remove_transcripts, transcript_ids)
+    return response.count or 0
@@ -0,0 +1,69 @@
+# text_codec.py
+"""Versioned compression for large text columns.
+
+A compressed value is still ordinary text: a tag naming the codec version,
+then the base64 of the compressed bytes. Untagged values are returned as
+they are, so rows written before compression was switched on keep
+working next to compressed ones, and a later codec version only needs a
+new entry in _CODECS while older tags stay readable.
+
+Compression is opt-in: set TEXT_CODEC_ENABLED=1 to write new values
+compressed. Compressed values no longer match database-side ilike
+search, so only enable it where the local search index is used instead.
+Reading compressed values works either way.
+"""
+import base64
+import os
+import zlib
+
+TEXT_CODEC_ENABLED = os.environ.get("TEXT_CODEC_ENABLED", "0") == "1"
+
+# "\x01" never occurs in transcript or summary text, so the tag can't collide
+CODEC_TAG_PREFIX = "\x01codec:"
+CODEC_VERSION = "z1"
+
+
+def _z1_encode(text):
+    return base64.b64encode(zlib.compress(text.encode("utf-8"), 9)).decode("ascii")
+
+
+def _z1_decode(payload):
+    return zlib.decompress(base64.b64decode(payload)).decode("utf-8")
+
+
+# version -> (encode, decode)
+_CODECS = {
+    "z1": (_z1_encode, _z1_decode),
+}
+
+
+def codec_version(value):
+    """The codec version a value was written with, or None for plain text"""
+    if not isinstance(value, str) or not value.startswith(CODEC_TAG_PREFIX):
+        return None
+    return value[len(CODEC_TAG_PREFIX):].partition(":")[0]
+
+
+def encode_text(text, min_chars: int = 0):
+    """Compress text with the current codec when it is long enough and actually shrinks"""
+    if not TEXT_CODEC_ENABLED or not isinstance(text, str) or len(text) < min_chars:
+        return text
+    version = codec_version(text)
+    if version == CODEC_VERSION:
+        return text
+    if version is not None:
+        text = decode_text(text)
+
+    encoded = f"{CODEC_TAG_PREFIX}{CODEC_VERSION}:{_CODECS[CODEC_VERSION][0](text)}"
+    return encoded if len(encoded) < len(text.encode("utf-8")) else text
+
+
+def decode_text(value):
+    """Return the plain text of a value, whether or not it was compressed"""
+    version = codec_version(value)
+    if version is None:
+        return value
+    codec = _CODECS.get(version)
+    if codec is None:
+        raise ValueError(f"Unknown text codec version: {version}")
+    return codec[1](value[len(CODEC_TAG_PREFIX) + len(version) + 1:])
@@ -0,0 +1,168 @@
+# transcript_processor.py
+"""Turn raw transcripts into meeting summaries, key points and follow-ups.
+
+Kept free of Streamlit so it can run from background workers as well as
+from the dashboard.
+"""
+from datetime import datetime, timedelta
+import re
+
+from model_registry import get_model_version
+from summarization import summarize_batch, summarize_long_text, summary_params
+from summary_cache import cache_key, get_cached, put_cached
+
+
+def extract_key_points(text, num_points=5):
+    """Extract key points from text using simple sentence extraction"""
+    sentences = re.split(r'[.!?]+', text)
+    sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
+
+    # Sort by length and take top sentences as key points
+    key_sentences = sorted(sentences, key=len, reverse=True)[:num_points]
+    return key_sentences
+
+
+def extract_followup_points(text):
+    """Extract potential followup points from text"""
+    followup_keywords = ['follow up', 'next steps', 'action items', 'todo', 'will discuss', 'next meeting', 'review']
+    followup_points = []
+
+    sentences = re.split(r'[.!?]+', text.lower())
+    for sentence in sentences:
+        if any(keyword in sentence for keyword in followup_keywords):
+            followup_points.append(sentence.strip().capitalize())
+
+    return followup_points[:3] if followup_points else ["Review meeting outcomes", "Schedule follow-up discussion"]
+
+
+def extract_next_meeting_schedule(text):
+    """Extract potential next meeting schedule from text"""
+    # Simple date/time extraction - this could be enhanced with NLP
+    date_patterns = [
+        r'next (monday|tuesday|wednesday|thursday|friday|saturday|sunday)',
+        r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday) next week',
+        r'in (\d+) days?',
+        r'next month',
+        r'next week'
+    ]
+
+    text_lower = text.lower()
+    for pattern in date_patterns:
+        if re.search(pattern, text_lower):
+            return (datetime.now() + timedelta(days=7)).isoformat()
+
+    return None
+
+
+def _fallback_summary(transcript_text):
+    return transcript_text[:200] + "..." if len(transcript_text) > 200 else transcript_text
+
+
+def _transcript_cache_key(transcript_text):
+    return cache_key(transcript_text, get_model_version(), summary_params())
+
+
+def _build_meeting_data(transcript_data, summary, summary_timings=None, cached=None):
+    transcript_text = transcript_data['transcript_text']
+
+    if cached:
+        key_points = cached['key_points']
+        followup_points = cached['followup_points']
+    else:
+        # Extract key points
+        key_points = extract_key_points(transcript_text)
+
+        # Extract followup points
+        followup_points = extract_followup_points(transcript_text)
+
+    # Extract next meeting schedule (relative to today, so never cached)
+    next_schedule = extract_next_meeting_schedule(transcript_text)
+
+    return {
+        'title': transcript_data.get('meeting_title', 'Untitled Meeting'),
+        'summary': summary,
+        'key_points': key_points,
+        'followup_points': followup_points,
+        'next_meet_schedule': next_schedule,
+        'transcript_id': transcript_data['id'],
+        'summary_timings': summary_timings
+    }
+
+
+def _cache_meeting_data(key, meeting_data):
+    put_cached(key, meeting_data['summary'], meeting_data['key_points'], meeting_data['followup_points'])
+
+
+def process_transcript_for_meeting(transcript_data):
+    """Process transcript data to extract meeting information"""
+    if not transcript_data or not transcript_data.get('transcript_text'):
+        return None
+
+    transcript_text = transcript_data['transcript_text']
+
+    # Reuse an earlier result for identical text, model and settings
+    key = _transcript_cache_key(transcript_text)
+    cached = get_cached(key)
+    if cached:
+        return _build_meeting_data(transcript_data, cached['summary'], cached=cached)
+
+    # Generate summary (long transcripts are chunked and map-reduced)
+    summary_timings = None
+    if len(transcript_text) > 100:
+        try:
+            summary, summary_timings = summarize_long_text(transcript_text)
+        except Exception as e:
+            print(f"Error summarizing transcript: {e}")
+            return _build_meeting_data(transcript_data, _fallback_summary(transcript_text))
+    else:
+        summary = _fallback_summary(transcript_text)
+
+    meeting_data = _build_meeting_data(transcript_data, summary, summary_timings)
+    _cache_meeting_data(key, meeting_data)
+    return meeting_data
+
+
+def process_transcripts_for_meetings(transcripts_by_meeting):
+    """Process many transcripts with batched inference.
+
+    Takes a dict of meeting id -> transcript row and returns
+    (processed, timings): a dict of meeting id -> meeting data for every
+    transcript that has text, plus the batch timings.
+    """
+    transcripts_by_meeting = {
+        meeting_id: transcript for meeting_id, transcript in transcripts_by_meeting.items()
+        if transcript and transcript.get('transcript_text')
+    }
+    processed = {}
+    keys = {}
+    for meeting_id, transcript in transcripts_by_meeting.items():
+        keys[meeting_id] = _transcript_cache_key(transcript['transcript_text'])
+        cached = get_cached(keys[meeting_id])
+        if cached:
+            processed[meeting_id] = _build_meeting_data(transcript, cached['summary'], cached=cached)
+
+    texts = {
+        meeting_id: transcript['transcript_text']
+        for meeting_id, transcript in transcripts_by_meeting.items()
+        if meeting_id not in processed and len(transcript['transcript_text']) > 100
+    }
+
+    summaries = {}
+    timings = None
+    failed = False
+    if texts:
+        try:
+            summaries, timings = summarize_batch(texts)
+        except Exception as e:
+            print(f"Error summarizing transcripts: {e}")
+            failed = True
+
+    for meeting_id, transcript in transcripts_by_meeting.items():
+        if meeting_id in processed:
+            continue
+        summary = summaries.get(meeting_id) or _fallback_summary(transcript['transcript_text'])
+        processed[meeting_id] = _build_meeting_data(transcript, summary)
+        # Only cache real model output, never the truncation fallback
+        if not failed:
+            _cache_meeting_data(keys[meeting_id], processed[meeting_id])
+    return processed, timings
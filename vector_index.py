@@ -0,0 +1,321 @@
+# vector_index.py
+"""Semantic meeting search backed by a NumPy vector index.
+
+Each meeting's title, summary and key points are embedded once with a
+small local sentence model. The vectors live in one contiguous float32
+matrix (optionally memory-mapped from disk) and queries run as a single
+vectorized cosine top-k. Changed meetings are queued and embedded in
+batches, either by the transcript worker or just before the next query.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+
+from local_store import BackgroundBuild, DebouncedSave, file_mtime
+
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "32"))
+VECTOR_INDEX_DIR = os.environ.get("VECTOR_INDEX_DIR", "vector_index")
+VECTOR_INDEX_MMAP = os.environ.get("VECTOR_INDEX_MMAP", "1") == "1"
+VECTOR_INDEX_SAVE_DELAY = float(os.environ.get("VECTOR_INDEX_SAVE_DELAY", "10"))
+# Seconds to wait after a failed initial build before trying again
+VECTOR_INDEX_BUILD_RETRY = float(os.environ.get("VECTOR_INDEX_BUILD_RETRY", "300"))
+
+_VECTORS_FILE = "vectors.npy"
+_IDS_FILE = "ids.json"
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+# --- Embedding model ---
+
+def _get_encoder():
+    """Load the sentence model once per process"""
+    global _encoder
+    if _encoder is not None:
+        return _encoder
+    with _encoder_lock:
+        if _encoder is None:
+            from transformers import AutoModel, AutoTokenizer
+
+            tokenizer = AutoTokenizer.from_pretrained(EMBEDDING_MODEL)
+            model = AutoModel.from_pretrained(EMBEDDING_MODEL)
+            model.eval()
+            _encoder = (tokenizer, model)
+        return _encoder
+
+
+def embed_texts(texts, batch_size: int = EMBEDDING_BATCH_SIZE):
+    """Embed texts into L2-normalized float32 vectors, one row per text"""
+    import torch
+
+    tokenizer, model = _get_encoder()
+    batches = []
+    with _encoder_lock, torch.no_grad():
+        for start in range(0, len(texts), batch_size):
+            encoded = tokenizer(
+                texts[start:start + batch_size], padding=True, truncation=True, max_length=256, return_tensors="pt"
+            )
+            hidden = model(**encoded).last_hidden_state
+            # Mean pooling over real (non-padding) tokens
+            mask = encoded["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            batches.append(pooled.numpy())
+
+    if not batches:
+        return np.zeros((0, 0), dtype=np.float32)
+    vectors = np.vstack(batches).astype(np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return vectors
+
+
+def meeting_embedding_text(meeting):
+    """Text that represents a meeting for semantic search"""
+    parts = [meeting.get("title") or "", meeting.get("summary") or ""]
+    parts.extend(meeting.get("key_points") or [])
+    return ". ".join(part for part in parts if part)
+
+
+# --- Vector store ---
+
+class VectorIndex:
+    """Contiguous float32 matrix of unit vectors with an id lookup"""
+
+    def __init__(self, vectors=None, ids=None):
+        self._lock = threading.RLock()
+        self._ids = list(ids or [])
+        self._positions = {meeting_id: i for i, meeting_id in enumerate(self._ids)}
+        self._vectors = vectors  # may be a read-only memmap until the first write
+        self._size = len(self._ids)
+
+    def __len__(self):
+        return self._size
+
+    def _writable(self, dim, extra):
+        """Ensure an in-memory matrix with room for `extra` more rows"""
+        needed = self._size + extra
+        vectors = self._vectors
+        if vectors is None:
+            self._vectors = np.zeros((max(needed, 64), dim), dtype=np.float32)
+        elif isinstance(vectors, np.memmap) or vectors.shape[0] < needed:
+            capacity = max(needed, vectors.shape[0] * 2 if vectors.shape[0] < needed else vectors.shape[0])
+            grown = np.zeros((capacity, vectors.shape[1]), dtype=np.float32)
+            grown[:self._size] = vectors[:self._size]
+            self._vectors = grown
+
+    def upsert(self, meeting_ids, vectors):
+        """Insert or replace vectors for the given meeting ids"""
+        if not len(meeting_ids):
+            return
+        with self._lock:
+            self._writable(vectors.shape[1], len(meeting_ids))
+            for meeting_id, vector in zip(meeting_ids, vectors):
+                position = self._positions.get(meeting_id)
+                if position is None:
+                    position = self._size
+                    self._ids.append(meeting_id)
+                    self._positions[meeting_id] = position
+                    self._size += 1
+                self._vectors[position] = vector
+
+    def remove(self, meeting_ids):
+        """Remove vectors by moving the last row into each freed slot"""
+        with self._lock:
+            for meeting_id in meeting_ids:
+                position = self._positions.pop(meeting_id, None)
+                if position is None:
+                    continue
+                if isinstance(self._vectors, np.memmap):
+                    self._writable(self._vectors.shape[1], 0)
+                last = self._size - 1
+                if position != last:
+                    moved_id = self._ids[last]
+                    self._vectors[position] = self._vectors[last]
+                    self._ids[position] = moved_id
+                    self._positions[moved_id] = position
+                self._ids.pop()
+                self._size -= 1
+
+    def search(self, query_vector, k: int = 20):
+        """Return up to k (meeting_id, cosine similarity) pairs, best first"""
+        with self._lock:
+            if not self._size:
+                return []
+            scores = self._vectors[:self._size] @ query_vector
+            k = min(k, self._size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self._ids[i], float(scores[i])) for i in top]
+
+    def stats(self):
+        with self._lock:
+            dim = self._vectors.shape[1] if self._vectors is not None else 0
+            return {
+                "vectors": self._size,
+                "dimensions": dim,
+                "matrix_bytes": self._size * dim * 4,
+                "memory_mapped": isinstance(self._vectors, np.memmap),
+            }
+
+    def save(self, directory):
+        with self._lock:
+            os.makedirs(directory, exist_ok=True)
+            vectors_path = os.path.join(directory, _VECTORS_FILE)
+            ids_path = os.path.join(directory, _IDS_FILE)
+            matrix = self._vectors[:self._size] if self._vectors is not None else np.zeros((0, 0), np.float32)
+            with open(vectors_path + ".tmp", "wb") as f:
+                np.save(f, np.ascontiguousarray(matrix, dtype=np.float32))
+            with open(ids_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(self._ids, f)
+            os.replace(vectors_path + ".tmp", vectors_path)
+            os.replace(ids_path + ".tmp", ids_path)
+
+    @classmethod
+    def load(cls, directory, mmap: bool = VECTOR_INDEX_MMAP):
+        vectors_path = os.path.join(directory, _VECTORS_FILE)
+        ids_path = os.path.join(directory, _IDS_FILE)
+        if not (os.path.exists(vectors_path) and os.path.exists(ids_path)):
+            return cls()
+        with open(ids_path, encoding="utf-8") as f:
+            ids = json.load(f)
+        vectors = np.load(vectors_path, mmap_mode="r" if mmap else None)
+        if not ids:
+            vectors = None
+        return cls(vectors, ids)
+
+
+# --- Process-wide index ---
+
+_index = None
+_index_lock = threading.Lock()
+_pending = {}
+_pending_lock = threading.Lock()
+# mtime of the ids file (replaced last on save) this process last loaded or
+# wrote; if another process rewrites the index, the files on disk win
+_index_mtime = None
+
+
+def _stored_mtime():
+    return file_mtime(os.path.join(VECTOR_INDEX_DIR, _IDS_FILE))
+
+
+def get_vector_index():
+    """Return the shared vector index, loading it from disk on first use or after another process replaced it.
+
+    Without index files every existing meeting is embedded in the
+    background (see rebuild_vector_index) while the incomplete in-memory
+    index is served; a failed build is retried after VECTOR_INDEX_BUILD_RETRY.
+    """
+    global _index, _index_mtime
+    if _index is not None and _index_mtime is not None and _stored_mtime() == _index_mtime:
+        return _index
+    with _index_lock:
+        mtime = _stored_mtime()
+        if mtime is None:
+            if _index is None:
+                _index = VectorIndex()
+            _initial_build.start()
+            return _index
+        if _index is None or mtime != _index_mtime:
+            if _index is not None:
+                print("Vector index files were replaced on disk, reloading them")
+            try:
+                _index = VectorIndex.load(VECTOR_INDEX_DIR)
+            except Exception as e:
+                print(f"Error loading vector index, starting empty: {e}")
+                _index = VectorIndex()
+            _index_mtime = mtime
+        return _index
+
+
+def save_vector_index(force: bool = False):
+    """Write the index to disk, keeping files another process replaced unless `force` is set"""
+    global _index, _index_mtime
+    with _index_lock:
+        if _index is None:
+            return
+        if not force and _index_mtime is None:
+            # Not built yet; the initial build writes the first files
+            return
+        if not force and _stored_mtime() != _index_mtime:
+            print("Vector index files were replaced on disk, keeping them instead of saving")
+            _index = None
+            return
+        _index.save(VECTOR_INDEX_DIR)
+        _index_mtime = _stored_mtime()
+
+
+_saver = DebouncedSave(save_vector_index, VECTOR_INDEX_SAVE_DELAY)
+
+
+def queue_meetings(meetings):
+    """Mark meetings for (re-)embedding on the next flush"""
+    with _pending_lock:
+        for meeting in meetings:
+            _pending[str(meeting["id"])] = meeting_embedding_text(meeting)
+
+
+def remove_meetings(meeting_ids):
+    meeting_ids = [str(meeting_id) for meeting_id in meeting_ids]
+    with _pending_lock:
+        for meeting_id in meeting_ids:
+            _pending.pop(meeting_id, None)
+    get_vector_index().remove(meeting_ids)
+    _saver.schedule()
+
+
+def flush_pending():
+    """Embed every queued meeting in batches and store the vectors"""
+    with _pending_lock:
+        pending = dict(_pending)
+        _pending.clear()
+    if not pending:
+        return 0
+
+    try:
+        vectors = embed_texts(list(pending.values()))
+    except Exception:
+        # Put the work back so a later flush can retry it
+        with _pending_lock:
+            for meeting_id, text in pending.items():
+                _pending.setdefault(meeting_id, text)
+        raise
+
+    get_vector_index().upsert(list(pending), vectors)
+    _saver.schedule()
+    return len(pending)
+
+
+def semantic_search(query, k: int = 50):
+    """Rank meetings by cosine similarity to the query"""
+    flush_pending()
+    query_vector = embed_texts([query])[0]
+    return get_vector_index().search(query_vector, k)
+
+
+def rebuild_vector_index(page_size: int = 200):
+    """Re-embed every meeting by paging through the table"""
+    global _index
+    from supabase_client import iter_meeting_pages
+
+    index = VectorIndex()
+    # Uncached pages (raising on failure): a full scan would only flush the query cache
+    for meetings in iter_meeting_pages(page_size, "id, created_at, title, summary, key_points"):
+        vectors = embed_texts([meeting_embedding_text(meeting) for meeting in meetings])
+        index.upsert([str(meeting["id"]) for meeting in meetings], vectors)
+
+    with _index_lock:
+        _index = index
+    save_vector_index(force=True)
+    return len(index)
+
+
+_initial_build = BackgroundBuild(rebuild_vector_index, "vector index build", VECTOR_INDEX_BUILD_RETRY)
+
+
+def index_building():
+    """Whether the initial build is still embedding existing meetings"""
+    return _initial_build.running